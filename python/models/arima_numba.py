@@ -0,0 +1,141 @@
+"""
+ARIMA compact compilé avec Numba (perte CSS)
+=============================================
+
+Implémentation minimale d'un ARIMA(p, d, q) ajusté par somme
+conditionnelle des carrés (CSS) : la récursion d'innovations est
+compilée en code machine par Numba, et l'optimisation se fait par
+Nelder-Mead. Sur les boucles walk-forward qui réajustent des dizaines
+de fois, cela remplace le filtre de Kalman de statsmodels par une
+boucle C sans dispatch Python.
+
+Sans Numba, les noyaux tournent en Python pur (corrects mais lents) ;
+les appelants gardent statsmodels en repli dans ce cas.
+"""
+
+import os
+
+import numpy as np
+from scipy.optimize import minimize
+
+# Cache de compilation persistant : avec cache=True, la deuxième
+# invocation du script recharge le code machine depuis ce répertoire au
+# lieu de repasser par LLVM (plusieurs secondes de démarrage à froid).
+# À poser avant le premier import de numba.
+os.environ.setdefault('NUMBA_CACHE_DIR',
+                      os.path.join(os.path.dirname(__file__), '.numba_cache'))
+
+try:
+    from numba import njit
+    HAS_NUMBA = True
+except ImportError:
+    HAS_NUMBA = False
+
+    def njit(*args, **kwargs):
+        def wrap(func):
+            return func
+        return wrap
+
+
+@njit(cache=True, fastmath=True, error_model='numpy')
+def css_loss(params, y, p, q):
+    """
+    Somme conditionnelle des carrés des innovations ARMA(p, q).
+
+    params = [mu, phi_1..phi_p, theta_1..theta_q] ; y est la série
+    (déjà différenciée). Les `max(p, q)` premiers résidus servent
+    d'amorce et sont exclus de la somme.
+    """
+    n = y.shape[0]
+    mu = params[0]
+    e = np.zeros(n)
+    for t in range(n):
+        pred = mu
+        for i in range(p):
+            if t - 1 - i >= 0:
+                pred += params[1 + i] * (y[t - 1 - i] - mu)
+        for j in range(q):
+            if t - 1 - j >= 0:
+                pred += params[1 + p + j] * e[t - 1 - j]
+        e[t] = y[t] - pred
+    s = 0.0
+    for t in range(max(p, q), n):
+        s += e[t] * e[t]
+    return s
+
+
+@njit(cache=True, fastmath=True, error_model='numpy')
+def _forecast_arma(params, y, p, q, steps):
+    """Prévisions ARMA sur la série différenciée (innovations futures = 0)."""
+    n = y.shape[0]
+    mu = params[0]
+    e = np.zeros(n)
+    for t in range(n):
+        pred = mu
+        for i in range(p):
+            if t - 1 - i >= 0:
+                pred += params[1 + i] * (y[t - 1 - i] - mu)
+        for j in range(q):
+            if t - 1 - j >= 0:
+                pred += params[1 + p + j] * e[t - 1 - j]
+        e[t] = y[t] - pred
+
+    # Tampon étendu : valeurs passées puis prévisions, erreurs futures nulles
+    y_ext = np.empty(n + steps)
+    y_ext[:n] = y
+    e_ext = np.zeros(n + steps)
+    e_ext[:n] = e
+    for t in range(n, n + steps):
+        pred = mu
+        for i in range(p):
+            pred += params[1 + i] * (y_ext[t - 1 - i] - mu)
+        for j in range(q):
+            pred += params[1 + p + j] * e_ext[t - 1 - j]
+        y_ext[t] = pred
+    return y_ext[n:]
+
+
+def fit_css(y, order, start_params=None):
+    """
+    Ajuste un ARIMA(p, d, q) par CSS + Nelder-Mead.
+
+    Args:
+        y: série brute (niveaux)
+        order: tuple (p, d, q)
+        start_params: vecteur [mu, phi.., theta..] pour démarrage à chaud
+
+    Returns:
+        Vecteur de paramètres optimisés
+    """
+    p, d, q = order
+    yd = np.diff(np.asarray(y, dtype=np.float64), n=d) if d else \
+        np.asarray(y, dtype=np.float64)
+
+    if start_params is not None:
+        x0 = np.asarray(start_params, dtype=np.float64)
+    else:
+        x0 = np.zeros(1 + p + q)
+        x0[0] = yd.mean()
+
+    res = minimize(css_loss, x0, args=(yd, p, q), method='Nelder-Mead',
+                   options={'maxiter': 2000, 'xatol': 1e-6, 'fatol': 1e-6})
+    return res.x
+
+
+def forecast_css(y, order, params, steps):
+    """
+    Prévisions en niveaux : récursion ARMA sur la série différenciée,
+    puis ré-intégration des différences (cumsum par ordre de d).
+    """
+    p, d, q = order
+    y = np.asarray(y, dtype=np.float64)
+    yd = np.diff(y, n=d) if d else y
+
+    preds = _forecast_arma(params, yd, p, q, steps)
+
+    # Ré-intégrer : chaque niveau de différenciation ajoute un cumsum
+    # ancré sur la dernière valeur observée du niveau correspondant
+    for k in range(d, 0, -1):
+        last = np.diff(y, n=k - 1)[-1]
+        preds = last + np.cumsum(preds)
+    return preds
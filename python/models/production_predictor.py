@@ -12,17 +12,190 @@ ARIMA n'est PAS inclus car ses performances sont insuffisantes (R² < 0).
 
 import pandas as pd
 import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+import math
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
 import json
 import os
+import pickle
 import warnings
 warnings.filterwarnings('ignore')
 
 from prophet import Prophet
-from sklearn.ensemble import RandomForestRegressor, GradientBoostingRegressor
-from sklearn.metrics import mean_absolute_error, mean_squared_error, r2_score
+from sklearn.ensemble import RandomForestRegressor, HistGradientBoostingRegressor
+from sklearn.metrics import mean_absolute_error, root_mean_squared_error, r2_score
 import joblib
 
+# Numba est optionnel : sans lui, les fonctions décorées restent du Python pur
+try:
+    from numba import njit
+except ImportError:
+    def njit(*args, **kwargs):
+        def wrap(func):
+            return func
+        return wrap
+
+# Taille du buffer d'historique nécessaire pour calculer toutes les features
+# (lag max = 30 + le jour courant pour trend_30d)
+_HIST_SIZE = 31
+
+_LAGS = (1, 2, 3, 7, 14, 21, 28, 30)
+_WINDOWS = (7, 14, 30)
+
+# Saison par mois (indice 0 inutilisé) : 0=automne, 1=hiver, 2=printemps,
+# 3=été — un seul gather remplace les trois passes isin + astype
+_MONTH_SEASON = np.array([0, 1, 1, 2, 2, 2, 3, 3, 3, 0, 0, 0, 1], dtype=np.int8)
+
+
+@njit(cache=True, fastmath=True)
+def _step_features(hist, dow, dom, month, quarter, woy, out):
+    """
+    Calcule les features du dernier jour connu du buffer `hist`.
+
+    Équivalent à la dernière ligne de create_features(), mais en O(1) :
+    seules les valeurs de la fenêtre de 31 jours sont lues, aucune
+    reconstruction pandas de l'historique complet.
+
+    Args:
+        hist: Buffer numpy des 31 dernières admissions (hist[-1] = jour courant)
+        dow, dom, month, quarter, woy: Composantes calendaires du jour courant
+        out: Buffer préalloué de taille len(feature_cols), rempli en place
+    """
+    # Features temporelles
+    out[0] = dow
+    out[1] = dom
+    out[2] = month
+    out[3] = quarter
+    out[4] = woy
+
+    # Features cycliques
+    out[5] = math.sin(2 * math.pi * dow / 7)
+    out[6] = math.cos(2 * math.pi * dow / 7)
+    out[7] = math.sin(2 * math.pi * month / 12)
+    out[8] = math.cos(2 * math.pi * month / 12)
+
+    # Features binaires
+    out[9] = 1.0 if dow >= 5 else 0.0
+    out[10] = 1.0 if dow == 0 else 0.0
+    out[11] = 1.0 if month in (12, 1, 2) else 0.0
+    out[12] = 1.0 if month in (3, 4, 5) else 0.0
+    out[13] = 1.0 if month in (6, 7, 8) else 0.0
+
+    # Lags (hist[-1] = admissions du jour courant)
+    for i, lag in enumerate(_LAGS):
+        out[14 + i] = hist[-1 - lag]
+
+    # Moyennes mobiles et écarts-types (ddof=1 comme pandas rolling().std())
+    for i, window in enumerate(_WINDOWS):
+        w = hist[-window:]
+        m = w.mean()
+        out[22 + i] = m
+        out[25 + i] = math.sqrt(((w - m) ** 2).sum() / (window - 1))
+
+    # Tendances
+    out[28] = hist[-1] - hist[-8]
+    out[29] = hist[-1] - hist[-31]
+
+
+# Jours cumulés en début de mois (indice 0 inutilisé), année non bissextile
+_DOY_OFFSET = np.array([0, 0, 31, 59, 90, 120, 151, 181, 212, 243, 273, 304, 334],
+                       dtype=np.int64)
+
+
+def _civil_from_days(days):
+    """
+    Décompose des jours-depuis-epoch en (année, mois, jour) vectorisé.
+
+    Algorithme civil_from_days de Howard Hinnant, en arithmétique entière
+    numpy pure : une seule passe sur la colonne de dates là où chaque
+    accesseur .dt (dayofweek, month, quarter, ...) relançait sa propre
+    itération C sur les mêmes timestamps.
+    """
+    z = days + 719468
+    era = np.floor_divide(z, 146097)
+    doe = z - era * 146097
+    yoe = (doe - doe // 1460 + doe // 36524 - doe // 146096) // 365
+    y = yoe + era * 400
+    doy = doe - (365 * yoe + yoe // 4 - yoe // 100)  # jour de l'année "mars"
+    mp = (5 * doy + 2) // 153
+    day = doy - (153 * mp + 2) // 5 + 1
+    month = np.where(mp < 10, mp + 3, mp - 9)
+    year = y + (month <= 2)
+    return year, month, day
+
+
+def _iso_week(dayofyear, dayofweek):
+    """
+    Numéro de semaine ISO par formule entière (scalaire ou vectorisé).
+
+    Évite dt.isocalendar() qui alloue un DataFrame à 3 colonnes et boxe
+    chaque date en objet Python. Aux tout premiers/derniers jours de
+    l'année la vraie semaine ISO peut appartenir à l'année voisine ; on
+    borne à [1, 53], sans incidence pour une feature de modèle.
+    """
+    return np.clip((dayofyear - dayofweek + 9) // 7, 1, 53)
+
+
+def _step_features_batch(hist, dow, dom, month, quarter, woy, out):
+    """
+    Variante vectorisée de _step_features pour un lot de trajectoires.
+
+    Args:
+        hist: Matrice (n_scenarios, 31) des historiques simulés
+        dow, dom, month, quarter, woy: Composantes calendaires du jour courant
+        out: Buffer (n_scenarios, n_features) rempli en place
+    """
+    out[:, 0] = dow
+    out[:, 1] = dom
+    out[:, 2] = month
+    out[:, 3] = quarter
+    out[:, 4] = woy
+
+    out[:, 5] = math.sin(2 * math.pi * dow / 7)
+    out[:, 6] = math.cos(2 * math.pi * dow / 7)
+    out[:, 7] = math.sin(2 * math.pi * month / 12)
+    out[:, 8] = math.cos(2 * math.pi * month / 12)
+
+    out[:, 9] = 1.0 if dow >= 5 else 0.0
+    out[:, 10] = 1.0 if dow == 0 else 0.0
+    out[:, 11] = 1.0 if month in (12, 1, 2) else 0.0
+    out[:, 12] = 1.0 if month in (3, 4, 5) else 0.0
+    out[:, 13] = 1.0 if month in (6, 7, 8) else 0.0
+
+    for i, lag in enumerate(_LAGS):
+        out[:, 14 + i] = hist[:, -1 - lag]
+
+    for i, window in enumerate(_WINDOWS):
+        w = hist[:, -window:]
+        m = w.mean(axis=1)
+        out[:, 22 + i] = m
+        out[:, 25 + i] = np.sqrt(((w - m[:, None]) ** 2).sum(axis=1) / (window - 1))
+
+    out[:, 28] = hist[:, -1] - hist[:, -8]
+    out[:, 29] = hist[:, -1] - hist[:, -31]
+
+
+def _blend_ensemble(gb_preds, rf_preds):
+    """
+    Moyenne pondérée 70/30 GB/RF sans tableau temporaire.
+
+    ``0.7 * gb + 0.3 * rf`` alloue deux intermédiaires ; ici on réutilise
+    les buffers de prédiction en place (les deux sont consommés). Pour
+    les très gros lots, numexpr (s'il est installé) garde les
+    intermédiaires en cache L1 et vectorise l'expression fusionnée.
+    """
+    if gb_preds.size > 365:
+        try:
+            import numexpr
+            return numexpr.evaluate('gb_preds * 0.7 + rf_preds * 0.3')
+        except ImportError:
+            pass
+    gb_preds *= 0.7
+    rf_preds *= 0.3
+    gb_preds += rf_preds
+    return gb_preds
+
 
 class ProductionPredictor:
     """
@@ -31,9 +204,14 @@ class ProductionPredictor:
     Utilise un ensemble de Gradient Boosting (principal) et Random Forest (validation).
     """
     
-    def __init__(self, data_path: str = None, models_dir: str = None):
+    def __init__(self, data_path: str = None, models_dir: str = None,
+                 fit_prophet_on_train: bool = False):
         self.data_path = data_path
         self.models_dir = models_dir
+        # Prophet ne sert qu'à l'analyse saisonnière : son fit Stan domine le
+        # temps d'entraînement, donc il est différé par défaut jusqu'au
+        # premier appel à get_seasonality_decomposition()
+        self.fit_prophet_on_train = fit_prophet_on_train
         self.df = None
         self.df_daily = None
         self.gb_model = None
@@ -41,6 +219,13 @@ class ProductionPredictor:
         self.prophet_model = None
         self.feature_cols = None
         self.metrics = {}
+        # État de prévision mis en cache en fin de train()/load_models() :
+        # permet à predict() de démarrer sans recharger ni réagréger le CSV
+        self._hist_buffer = None
+        self._last_date = None
+        # Modèles Treelite optionnels (voir enable_fast_inference)
+        self._gb_treelite = None
+        self._rf_treelite = None
         
     def load_data(self, data_path: str = None):
         """Charge et prépare les données."""
@@ -76,13 +261,20 @@ class ProductionPredictor:
         """Crée les features optimisées pour la prédiction."""
         df = df.copy()
         
-        # Features temporelles
-        df['day_of_week'] = df['date'].dt.dayofweek
-        df['day_of_month'] = df['date'].dt.day
-        df['month'] = df['date'].dt.month
-        df['quarter'] = df['date'].dt.quarter
-        df['week_of_year'] = df['date'].dt.isocalendar().week.astype(int)
-        df['year'] = df['date'].dt.year
+        # Features temporelles : une seule passe entière sur les dates au
+        # lieu de six itérations d'accesseurs .dt sur les mêmes timestamps
+        days = df['date'].to_numpy(dtype='datetime64[D]').astype(np.int64)
+        dow = (days + 3) % 7  # l'epoch (1970-01-01) était un jeudi
+        year, month, dom = _civil_from_days(days)
+        leap = (year % 4 == 0) & ((year % 100 != 0) | (year % 400 == 0))
+        doy = _DOY_OFFSET[month] + dom + (leap & (month > 2))
+
+        df['day_of_week'] = dow
+        df['day_of_month'] = dom
+        df['month'] = month
+        df['quarter'] = (month - 1) // 3 + 1
+        df['week_of_year'] = _iso_week(doy, dow)
+        df['year'] = year
         
         # Features cycliques
         df['sin_day_week'] = np.sin(2 * np.pi * df['day_of_week'] / 7)
@@ -93,24 +285,41 @@ class ProductionPredictor:
         # Features binaires
         df['is_weekend'] = (df['day_of_week'] >= 5).astype(int)
         df['is_monday'] = (df['day_of_week'] == 0).astype(int)
-        df['is_winter'] = df['month'].isin([12, 1, 2]).astype(int)
-        df['is_spring'] = df['month'].isin([3, 4, 5]).astype(int)
-        df['is_summer'] = df['month'].isin([6, 7, 8]).astype(int)
-        
+        season = _MONTH_SEASON[df['month'].to_numpy()]
+        df['is_winter'] = (season == 1).astype(int)
+        df['is_spring'] = (season == 2).astype(int)
+        df['is_summer'] = (season == 3).astype(int)
+        
+        # Lags, moyennes mobiles et tendances en un seul passage numpy :
+        # chaque shift()/rolling() pandas rescannait toute la colonne en
+        # allouant une Series intermédiaire
+        y = df['admissions'].to_numpy(dtype=np.float64)
+        n = len(y)
+        derived = {}
+
         # Lags (features les plus importantes selon notre analyse)
-        for lag in [1, 2, 3, 7, 14, 21, 28, 30]:
-            df[f'lag_{lag}'] = df['admissions'].shift(lag)
-        
-        # Moyennes mobiles
-        for window in [7, 14, 30]:
-            df[f'ma_{window}'] = df['admissions'].rolling(window=window).mean()
-            df[f'std_{window}'] = df['admissions'].rolling(window=window).std()
-        
+        for lag in _LAGS:
+            lagged = np.full(n, np.nan)
+            lagged[lag:] = y[:-lag]
+            derived[f'lag_{lag}'] = lagged
+
+        # Moyennes mobiles (ddof=1 comme pandas rolling().std())
+        for window in _WINDOWS:
+            ma = np.full(n, np.nan)
+            std = np.full(n, np.nan)
+            if n >= window:
+                sw = sliding_window_view(y, window)
+                ma[window - 1:] = sw.mean(axis=1)
+                std[window - 1:] = sw.std(axis=1, ddof=1)
+            derived[f'ma_{window}'] = ma
+            derived[f'std_{window}'] = std
+
         # Tendances (très importantes pour Gradient Boosting)
-        df['trend_7d'] = df['admissions'] - df['admissions'].shift(7)
-        df['trend_30d'] = df['admissions'] - df['admissions'].shift(30)
-        
-        return df
+        derived['trend_7d'] = y - derived['lag_7']
+        derived['trend_30d'] = y - derived['lag_30']
+
+        # Une seule insertion de colonnes au lieu de 16 réallocations
+        return df.assign(**derived)
     
     def get_feature_columns(self):
         """Retourne la liste des colonnes de features."""
@@ -139,80 +348,92 @@ class ProductionPredictor:
         df_features = df_features.dropna()
         
         self.feature_cols = self.get_feature_columns()
-        
+
+        # Une seule matrice numpy float32 pour tout le monde : les deux
+        # projections pandas train/test copiaient chacune les 29 colonnes,
+        # alors qu'un slicing de lignes numpy est une vue O(1). float32
+        # suffit pour ces features et évite la conversion interne de sklearn
+        X = df_features[self.feature_cols].to_numpy(dtype=np.float32)
+        y = df_features['admissions'].to_numpy(dtype=np.float32)
+
         # Split temporel
         train_end = int(len(df_features) * train_ratio)
-        
-        train_df = df_features.iloc[:train_end]
-        test_df = df_features.iloc[train_end:]
-        
-        X_train = train_df[self.feature_cols]
-        y_train = train_df['admissions']
-        X_test = test_df[self.feature_cols]
-        y_test = test_df['admissions']
+
+        X_train, X_test = X[:train_end], X[train_end:]
+        y_train, y_test = y[:train_end], y[train_end:]
         
         print(f"\n📊 Split {int(train_ratio*100)}/{int((1-train_ratio)*100)}:")
         print(f"   Train: {len(X_train)} jours")
         print(f"   Test: {len(X_test)} jours")
         
-        # 1. Entraîner Gradient Boosting (modèle principal)
-        print("\n🚀 Entraînement Gradient Boosting (modèle principal)...")
-        self.gb_model = GradientBoostingRegressor(
-            n_estimators=200,
-            max_depth=8,
-            learning_rate=0.1,
-            min_samples_split=5,
-            min_samples_leaf=3,
-            subsample=0.8,
-            random_state=42
-        )
-        self.gb_model.fit(X_train, y_train)
-        
-        gb_pred = self.gb_model.predict(X_test)
+        # Les fits sont indépendants et libèrent le GIL dans le code natif
+        # (arbres sklearn, Stan) : on les lance en parallèle sur des threads,
+        # le temps mur devient max(t_gb, t_rf, t_prophet) au lieu de la somme
+        print("\n🚀 Entraînement parallèle Gradient Boosting + Random Forest...")
+
+        # Limiter les threads internes de la RF pour ne pas sursouscrire
+        # les cœurs pendant que le GB tourne en OpenMP à côté. Et sous
+        # ~200k cellules, le démarrage du pool joblib coûte plus cher que
+        # le fit lui-même : rester séquentiel
+        if len(X_train) * len(self.feature_cols) > 200_000:
+            rf_n_jobs = max(1, (os.cpu_count() or 1) // 2)
+        else:
+            rf_n_jobs = 1
+
+        def _fit_gb():
+            # Version histogramme (binning + OpenMP), même famille
+            # d'algorithme que GradientBoostingRegressor mais 10-100x
+            # plus rapide à entraîner
+            model = HistGradientBoostingRegressor(
+                max_iter=200,
+                max_depth=8,
+                learning_rate=0.1,
+                min_samples_leaf=3,
+                early_stopping=False,
+                random_state=42
+            )
+            model.fit(X_train, y_train)
+            return model, model.predict(X_test)
+
+        def _fit_rf():
+            model = RandomForestRegressor(
+                n_estimators=200,
+                max_depth=20,
+                min_samples_split=5,
+                min_samples_leaf=2,
+                max_features='sqrt',
+                random_state=42,
+                n_jobs=rf_n_jobs
+            )
+            model.fit(X_train, y_train)
+            return model, model.predict(X_test)
+
+        with ThreadPoolExecutor(max_workers=3) as pool:
+            gb_future = pool.submit(_fit_gb)
+            rf_future = pool.submit(_fit_rf)
+            prophet_future = (pool.submit(self.fit_prophet)
+                              if self.fit_prophet_on_train else None)
+
+            self.gb_model, gb_pred = gb_future.result()
+            self.rf_model, rf_pred = rf_future.result()
+            if prophet_future is not None:
+                prophet_future.result()
+
         self.metrics['gradient_boosting'] = self._calculate_metrics(y_test, gb_pred)
-        
+        print(f"\n🚀 Gradient Boosting (modèle principal)")
         print(f"   ✅ MAE: {self.metrics['gradient_boosting']['mae']:.2f}")
         print(f"   ✅ R²:  {self.metrics['gradient_boosting']['r2']:.4f}")
-        
-        # 2. Entraîner Random Forest (modèle de validation)
-        print("\n🌲 Entraînement Random Forest (modèle de validation)...")
-        self.rf_model = RandomForestRegressor(
-            n_estimators=200,
-            max_depth=20,
-            min_samples_split=5,
-            min_samples_leaf=2,
-            max_features='sqrt',
-            random_state=42,
-            n_jobs=-1
-        )
-        self.rf_model.fit(X_train, y_train)
-        
-        rf_pred = self.rf_model.predict(X_test)
+
         self.metrics['random_forest'] = self._calculate_metrics(y_test, rf_pred)
-        
+        print(f"\n🌲 Random Forest (modèle de validation)")
         print(f"   ✅ MAE: {self.metrics['random_forest']['mae']:.2f}")
         print(f"   ✅ R²:  {self.metrics['random_forest']['r2']:.4f}")
-        
-        # 3. Entraîner Prophet (pour décomposition saisonnière)
-        print("\n🔮 Entraînement Prophet (analyse saisonnière)...")
-        prophet_train = pd.DataFrame({
-            'ds': train_df['date'],
-            'y': train_df['admissions']
-        })
-        
-        self.prophet_model = Prophet(
-            yearly_seasonality=True,
-            weekly_seasonality=True,
-            daily_seasonality=False,
-            changepoint_prior_scale=0.05,
-            seasonality_mode='additive',
-            interval_width=0.95
-        )
-        self.prophet_model.add_seasonality(name='monthly', period=30.5, fourier_order=5)
-        self.prophet_model.fit(prophet_train)
-        
-        print("   ✅ Prophet entraîné (utilisé pour analyse saisonnière)")
-        
+
+        # Mémoriser l'état de prévision : predict() repart de ce buffer
+        # au lieu de reconstruire les features depuis df_daily
+        self._hist_buffer = self.df_daily['admissions'].to_numpy(dtype=np.float64)[-_HIST_SIZE:]
+        self._last_date = self.df_daily['date'].iloc[-1]
+
         # Résumé
         print("\n" + "-" * 60)
         print("📊 RÉSUMÉ DES PERFORMANCES (sur ensemble de test)")
@@ -228,79 +449,305 @@ class ProductionPredictor:
         
         return self.metrics
     
+    def partial_train(self, new_df: pd.DataFrame, n_new_trees: int = 20):
+        """
+        Ré-entraînement incrémental avec warm start.
+
+        Pour l'arrivée quotidienne de nouvelles données : ajoute les
+        admissions à l'historique puis complète les ensembles existants
+        (+n_new_trees arbres RF / itérations GB) au lieu de reconstruire
+        les 200 arbres depuis zéro — coût amorti en O(k·N) par jour.
+
+        Args:
+            new_df: DataFrame avec colonnes 'date' et 'admissions'
+            n_new_trees: Arbres (RF) / itérations (GB) ajoutés par appel
+        """
+        if self.gb_model is None or self.rf_model is None:
+            raise ValueError("Le modèle doit d'abord être entraîné")
+
+        print(f"\n♻️ Ré-entraînement incrémental (+{len(new_df)} jours, "
+              f"+{n_new_trees} arbres)...")
+
+        new_df = new_df[['date', 'admissions']].copy()
+        new_df['date'] = pd.to_datetime(new_df['date'])
+        self.df_daily = (
+            pd.concat([self.df_daily, new_df], ignore_index=True)
+            .drop_duplicates('date', keep='last')
+            .sort_values('date')
+            .reset_index(drop=True)
+        )
+
+        df_features = self.create_features(self.df_daily).dropna()
+        df_features[self.feature_cols] = df_features[self.feature_cols].astype(np.float32)
+        X = df_features[self.feature_cols]
+        y = df_features['admissions']
+
+        self.gb_model.set_params(
+            warm_start=True, max_iter=self.gb_model.max_iter + n_new_trees)
+        self.gb_model.fit(X, y)
+
+        self.rf_model.set_params(
+            warm_start=True, n_estimators=self.rf_model.n_estimators + n_new_trees)
+        self.rf_model.fit(X, y)
+
+        # Rafraîchir l'état de prévision
+        self._hist_buffer = self.df_daily['admissions'].to_numpy(dtype=np.float64)[-_HIST_SIZE:]
+        self._last_date = self.df_daily['date'].iloc[-1]
+
+        print(f"   ✅ GB: {self.gb_model.max_iter} itérations, "
+              f"RF: {self.rf_model.n_estimators} arbres")
+
     def _calculate_metrics(self, y_true, y_pred):
         """Calcule les métriques de performance."""
-        y_true_safe = np.where(y_true == 0, 1, y_true)
+        y_true = np.asarray(y_true)
+        y_pred = np.asarray(y_pred)
+        # MAPE sur les valeurs non nulles uniquement : évite la copie
+        # complète que faisait np.where(y_true == 0, 1, y_true)
+        mask = y_true != 0
         return {
             'mae': mean_absolute_error(y_true, y_pred),
-            'rmse': np.sqrt(mean_squared_error(y_true, y_pred)),
-            'mape': np.mean(np.abs((y_true - y_pred) / y_true_safe)) * 100,
+            'rmse': root_mean_squared_error(y_true, y_pred),
+            'mape': np.mean(np.abs((y_true[mask] - y_pred[mask]) / y_true[mask])) * 100,
             'r2': r2_score(y_true, y_pred)
         }
     
-    def predict(self, days: int = 30, return_confidence: bool = True):
+    def enable_fast_inference(self):
+        """
+        Bascule l'inférence des arbres sur Treelite (GTIL) si disponible.
+
+        Le predict sklearn repasse par la validation Python et un
+        parcours d'arbres ligne à ligne ; GTIL est le prédicteur C++
+        multi-thread de Treelite, nettement plus rapide en batch comme
+        en ligne. Sans treelite installé, on reste silencieusement sur
+        l'inférence sklearn.
+        """
+        try:
+            import treelite.sklearn
+        except ImportError:
+            print("   ⚠️ treelite non installé, inférence sklearn conservée")
+            return False
+
+        try:
+            self._gb_treelite = treelite.sklearn.import_model(self.gb_model)
+            self._rf_treelite = treelite.sklearn.import_model(self.rf_model)
+        except Exception as e:
+            print(f"   ⚠️ Conversion Treelite impossible: {e}")
+            self._gb_treelite = None
+            self._rf_treelite = None
+            return False
+
+        print("   ✅ Inférence Treelite activée (GB + RF)")
+        return True
+
+    def _gb_predict(self, X):
+        """Scoring GB, via Treelite si activé."""
+        if self._gb_treelite is not None:
+            import treelite
+            return treelite.gtil.predict(
+                self._gb_treelite, np.ascontiguousarray(X, dtype=np.float32)).ravel()
+        return self.gb_model.predict(X)
+
+    def _rf_predict(self, X):
+        """Scoring RF, via Treelite si activé."""
+        if self._rf_treelite is not None:
+            import treelite
+            return treelite.gtil.predict(
+                self._rf_treelite, np.ascontiguousarray(X, dtype=np.float32)).ravel()
+        return self.rf_model.predict(X)
+
+    def _forecast_state(self):
+        """Retourne (buffer des 31 dernières admissions, dernière date connue)."""
+        if self._hist_buffer is not None:
+            tail = np.asarray(self._hist_buffer, dtype=np.float64)[-_HIST_SIZE:]
+            last_date = self._last_date
+        else:
+            tail = self.df_daily['admissions'].to_numpy(dtype=np.float64)[-_HIST_SIZE:]
+            last_date = self.df_daily['date'].iloc[-1]
+
+        hist = np.full(_HIST_SIZE, np.nan)
+        hist[_HIST_SIZE - len(tail):] = tail
+        return hist, pd.Timestamp(last_date)
+
+    def predict(self, days: int = 30, return_confidence: bool = True,
+                n_scenarios: int = 1):
         """
         Génère des prédictions pour les jours futurs.
-        
+
         Args:
             days: Nombre de jours à prédire
             return_confidence: Inclure les intervalles de confiance
-        
+            n_scenarios: Si > 1, simule ce nombre de trajectoires Monte-Carlo
+                (bruit résiduel réinjecté dans l'historique) et dérive les
+                intervalles de confiance empiriquement. Les trajectoires sont
+                empilées en un seul batch par pas : un appel model.predict
+                par pas au lieu d'un par trajectoire.
+
         Returns:
             DataFrame avec les prédictions
         """
+        if n_scenarios > 1:
+            return self._predict_monte_carlo(days, n_scenarios)
+
         print(f"\n🔮 Génération de prédictions pour {days} jours...")
-        
-        df_extended = self.df_daily.copy()
-        predictions = []
-        
+
+        # Buffer circulaire des 31 dernières admissions : les features d'un pas
+        # ne dépendent que de cette fenêtre, inutile de reconstruire tout
+        # l'historique à chaque itération (O(1) par pas au lieu de O(N))
+        hist, current_date = self._forecast_state()
+
+        feat_buf = np.empty((1, len(self.feature_cols)), dtype=np.float32)
+
+        # Sortie préallouée en structure-of-arrays : une écriture par pas,
+        # conversion en DataFrame une seule fois à la fin
+        out = np.empty(days, dtype=[
+            ('date', 'datetime64[D]'),
+            ('prediction', 'i4'), ('gb_prediction', 'i4'), ('rf_prediction', 'i4'),
+            ('lower_bound', 'i4'), ('upper_bound', 'i4'),
+        ])
+        rmse = self.metrics['gradient_boosting']['rmse'] if return_confidence else 0.0
+
         for i in range(days):
-            # Créer features pour le jour à prédire
-            df_features = self.create_features(df_extended)
-            last_features = df_features[self.feature_cols].iloc[-1:].fillna(0)
-            
+            # Features du dernier jour connu (comme iloc[-1:] sur create_features)
+            _step_features(
+                hist,
+                current_date.dayofweek, current_date.day, current_date.month,
+                current_date.quarter,
+                int(_iso_week(current_date.dayofyear, current_date.dayofweek)),
+                feat_buf[0]
+            )
+            np.nan_to_num(feat_buf, copy=False)  # équivalent du fillna(0)
+
             # Prédiction Gradient Boosting (principal)
-            gb_pred = self.gb_model.predict(last_features)[0]
-            
+            gb_pred = self._gb_predict(feat_buf)[0]
+
             # Prédiction Random Forest (validation)
-            rf_pred = self.rf_model.predict(last_features)[0]
-            
+            rf_pred = self._rf_predict(feat_buf)[0]
+
             # Prédiction finale (moyenne pondérée favorisant GB)
             # GB a un meilleur R², donc on lui donne plus de poids
             final_pred = 0.7 * gb_pred + 0.3 * rf_pred
             final_pred = max(0, final_pred)  # Assurer valeur positive
-            
+
             # Ajouter à l'historique pour la prochaine prédiction
-            next_date = df_extended['date'].max() + timedelta(days=1)
-            df_extended = pd.concat([
-                df_extended,
-                pd.DataFrame([{'date': next_date, 'admissions': final_pred}])
-            ], ignore_index=True)
-            
-            # Calculer intervalles de confiance
-            if return_confidence:
-                # Basé sur le RMSE historique
-                rmse = self.metrics['gradient_boosting']['rmse']
-                lower = max(0, final_pred - 1.96 * rmse)
-                upper = final_pred + 1.96 * rmse
-            
+            next_date = current_date + timedelta(days=1)
+            hist[:-1] = hist[1:]
+            hist[-1] = final_pred
+            current_date = next_date
+
+            # Intervalles de confiance basés sur le RMSE historique
+            lower = max(0, final_pred - 1.96 * rmse)
+            upper = final_pred + 1.96 * rmse
+
+            out[i] = (np.datetime64(next_date, 'D'), round(final_pred),
+                      round(gb_pred), round(rf_pred), round(lower), round(upper))
+
+        result = pd.DataFrame(out)
+        result['date'] = pd.to_datetime(result['date'])
+        if return_confidence:
+            result['confidence'] = 0.95
+        else:
+            result['lower_bound'] = None
+            result['upper_bound'] = None
+            result['confidence'] = None
+        return result
+
+    def _predict_monte_carlo(self, days: int, n_scenarios: int):
+        """
+        Prédiction par trajectoires Monte-Carlo batchées.
+
+        Chaque pas score les n_scenarios trajectoires en un seul appel
+        model.predict (l'overhead fixe de predict domine largement le
+        scoring d'une ligne). Le bruit résiduel (RMSE historique) est
+        réinjecté dans chaque trajectoire pour propager l'incertitude.
+        """
+        print(f"\n🔮 Génération de prédictions pour {days} jours "
+              f"({n_scenarios} scénarios)...")
+
+        rmse = self.metrics['gradient_boosting']['rmse']
+        rng = np.random.default_rng(42)
+
+        hist, current_date = self._forecast_state()
+        hist_mc = np.tile(hist, (n_scenarios, 1))
+
+        feat_buf = np.empty((n_scenarios, len(self.feature_cols)), dtype=np.float32)
+        predictions = []
+
+        for i in range(days):
+            _step_features_batch(
+                hist_mc,
+                current_date.dayofweek, current_date.day, current_date.month,
+                current_date.quarter,
+                int(_iso_week(current_date.dayofyear, current_date.dayofweek)),
+                feat_buf
+            )
+            np.nan_to_num(feat_buf, copy=False)
+
+            # Un seul appel par modèle pour tout le lot de trajectoires
+            gb_preds = self._gb_predict(feat_buf)
+            rf_preds = self._rf_predict(feat_buf)
+            # Moyennes par modèle capturées AVANT le blend : le helper
+            # consomme ses buffers en place
+            gb_mean = float(gb_preds.mean())
+            rf_mean = float(rf_preds.mean())
+            blended = _blend_ensemble(gb_preds, rf_preds)
+            np.maximum(blended, 0, out=blended)
+
+            next_date = current_date + timedelta(days=1)
+
+            # Réinjecter avec bruit résiduel pour propager l'incertitude
+            noisy = np.maximum(blended + rng.normal(0, rmse, n_scenarios), 0)
+            hist_mc[:, :-1] = hist_mc[:, 1:]
+            hist_mc[:, -1] = noisy
+            current_date = next_date
+
             predictions.append({
                 'date': next_date,
-                'prediction': round(final_pred),
-                'gb_prediction': round(gb_pred),
-                'rf_prediction': round(rf_pred),
-                'lower_bound': round(lower) if return_confidence else None,
-                'upper_bound': round(upper) if return_confidence else None,
-                'confidence': 0.95 if return_confidence else None
+                'prediction': round(float(blended.mean())),
+                'gb_prediction': round(gb_mean),
+                'rf_prediction': round(rf_mean),
+                'lower_bound': round(float(np.percentile(noisy, 2.5))),
+                'upper_bound': round(float(np.percentile(noisy, 97.5))),
+                'confidence': 0.95
             })
-        
+
         return pd.DataFrame(predictions)
-    
+
+    def fit_prophet(self):
+        """
+        Entraîne Prophet pour la décomposition saisonnière.
+
+        uncertainty_samples=0 : la décomposition n'a pas besoin des
+        trajectoires d'incertitude, ce qui évite la boucle de simulation
+        de Prophet et accélère nettement fit + predict.
+        """
+        print("\n🔮 Entraînement Prophet (analyse saisonnière)...")
+        prophet_train = pd.DataFrame({
+            'ds': self.df_daily['date'],
+            'y': self.df_daily['admissions']
+        })
+
+        self.prophet_model = Prophet(
+            yearly_seasonality=True,
+            weekly_seasonality=True,
+            daily_seasonality=False,
+            changepoint_prior_scale=0.05,
+            seasonality_mode='additive',
+            interval_width=0.95,
+            uncertainty_samples=0
+        )
+        self.prophet_model.add_seasonality(name='monthly', period=30.5, fourier_order=5)
+        self.prophet_model.fit(prophet_train)
+
+        print("   ✅ Prophet entraîné (utilisé pour analyse saisonnière)")
+        return self.prophet_model
+
     def get_seasonality_decomposition(self):
-        """Retourne la décomposition saisonnière via Prophet."""
+        """Retourne la décomposition saisonnière via Prophet (fit différé)."""
         if self.prophet_model is None:
-            raise ValueError("Le modèle doit d'abord être entraîné")
-        
+            if self.df_daily is None:
+                raise ValueError("Le modèle doit d'abord être entraîné")
+            self.fit_prophet()
+
         future = self.prophet_model.make_future_dataframe(periods=30)
         forecast = self.prophet_model.predict(future)
         
@@ -316,9 +763,13 @@ class ProductionPredictor:
         os.makedirs(output_dir, exist_ok=True)
         
         # Sauvegarder les modèles
-        joblib.dump(self.gb_model, os.path.join(output_dir, 'gradient_boosting_prod.pkl'))
-        joblib.dump(self.rf_model, os.path.join(output_dir, 'random_forest_prod.pkl'))
-        joblib.dump(self.prophet_model, os.path.join(output_dir, 'prophet_prod.pkl'))
+        # compress=0 : les tableaux numpy des arbres restent bruts sur disque,
+        # ce qui permet un chargement memory-mappé (pages lues à la demande)
+        dump_opts = {'compress': 0, 'protocol': pickle.HIGHEST_PROTOCOL}
+        joblib.dump(self.gb_model, os.path.join(output_dir, 'gradient_boosting_prod.pkl'), **dump_opts)
+        joblib.dump(self.rf_model, os.path.join(output_dir, 'random_forest_prod.pkl'), **dump_opts)
+        if self.prophet_model is not None:
+            joblib.dump(self.prophet_model, os.path.join(output_dir, 'prophet_prod.pkl'), **dump_opts)
         
         # Sauvegarder les métriques et config
         config = {
@@ -328,6 +779,8 @@ class ProductionPredictor:
             'feature_columns': self.feature_cols,
             'metrics': self.metrics,
             'ensemble_weights': {'gradient_boosting': 0.7, 'random_forest': 0.3},
+            'history_buffer': [float(v) for v in self._hist_buffer] if self._hist_buffer is not None else None,
+            'last_date': self._last_date.strftime('%Y-%m-%d') if self._last_date is not None else None,
             'trained_at': datetime.now().isoformat(),
             'note': 'ARIMA exclus car performances insuffisantes (R² < 0)'
         }
@@ -338,18 +791,36 @@ class ProductionPredictor:
         print(f"\n💾 Modèles sauvegardés dans: {output_dir}")
         return output_dir
     
-    def load_models(self, models_dir: str):
-        """Charge des modèles pré-entraînés."""
-        self.gb_model = joblib.load(os.path.join(models_dir, 'gradient_boosting_prod.pkl'))
-        self.rf_model = joblib.load(os.path.join(models_dir, 'random_forest_prod.pkl'))
-        self.prophet_model = joblib.load(os.path.join(models_dir, 'prophet_prod.pkl'))
+    def load_models(self, models_dir: str, mmap: bool = False):
+        """Charge des modèles pré-entraînés.
+
+        Args:
+            models_dir: Répertoire des modèles sauvegardés
+            mmap: Si True, mappe les buffers des arbres depuis le fichier
+                  au lieu de les copier en mémoire (seules les pages
+                  traversées en prédiction sont chargées). Les buffers
+                  sont alors en lecture seule : réservé à l'inférence
+                  pure, incompatible avec partial_train().
+        """
+        mmap_mode = 'r' if mmap else None
+        self.gb_model = joblib.load(os.path.join(models_dir, 'gradient_boosting_prod.pkl'), mmap_mode=mmap_mode)
+        self.rf_model = joblib.load(os.path.join(models_dir, 'random_forest_prod.pkl'), mmap_mode=mmap_mode)
+
+        prophet_path = os.path.join(models_dir, 'prophet_prod.pkl')
+        if os.path.exists(prophet_path):
+            self.prophet_model = joblib.load(prophet_path, mmap_mode=mmap_mode)
         
         with open(os.path.join(models_dir, 'production_config.json'), 'r') as f:
             config = json.load(f)
         
         self.feature_cols = config['feature_columns']
         self.metrics = config['metrics']
-        
+
+        # Restaurer l'état de prévision : predict() fonctionne sans re-CSV
+        if config.get('history_buffer') is not None:
+            self._hist_buffer = np.array(config['history_buffer'], dtype=np.float64)
+            self._last_date = pd.Timestamp(config['last_date'])
+
         print(f"✅ Modèles chargés depuis: {models_dir}")
         return config
     
